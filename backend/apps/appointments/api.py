@@ -1,12 +1,16 @@
 from ninja import Router
-from ninja.pagination import paginate, PageNumberPagination
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
 from django.core.exceptions import ValidationError
+from django.http import Http404
 from django.utils import timezone
-from typing import List, Optional
+from typing import Optional
+import logging
 import math
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from .models import Appointment
 from .schemas import (
@@ -17,13 +21,139 @@ from .schemas import (
     AvailabilityCheckSchema,
     AvailableSlotsResponseSchema
 )
-from .services import AppointmentService
+from .services import AppointmentService, APPOINTMENT_COUNT_CACHE_TTL, AVAILABILITY_CACHE_TTL
+from .tasks import warm_availability
+from apps.core.responses import orjson_response
 from apps.clients.models import Client
 from apps.services.models import Service
 from apps.staff.models import StaffProfile
 
 router = Router()
 
+logger = logging.getLogger(__name__)
+
+
+# Display names built by the database so responses read a single column each
+_APPOINTMENT_NAME_ANNOTATIONS = {
+    'client_name': F('client__full_name'),
+    'service_name': F('service__name'),
+    'staff_name': Concat(
+        'staff_member__user__first_name', Value(' '), 'staff_member__user__last_name'
+    ),
+}
+
+
+def _appointment_queryset():
+    """Appointments joined with the relations every response reads."""
+    return Appointment.objects.with_relations().annotate(**_APPOINTMENT_NAME_ANNOTATIONS)
+
+
+# Appointment columns echoed back by AppointmentResponseSchema
+_APPOINTMENT_FIELDS = (
+    'id',
+    'client_id',
+    'service_id',
+    'staff_member_id',
+    'scheduled_start_time',
+    'scheduled_end_time',
+    'duration_minutes',
+    'status',
+    'payment_status',
+    'price_cents',
+    'notes',
+    'cancellation_reason',
+    'actual_start_time',
+    'actual_end_time',
+    'created_at',
+    'updated_at',
+)
+
+# Model field names keyed by the attribute names update payloads use
+_APPOINTMENT_FIELD_NAMES = {field.attname: field.name for field in Appointment._meta.concrete_fields}
+_APPOINTMENT_FIELD_NAMES['price'] = 'price_cents'  # Appointment.price converts to cents
+
+# Free-text columns left out of list rows unless explicitly requested
+_APPOINTMENT_TEXT_FIELDS = ('notes', 'cancellation_reason')
+_APPOINTMENT_SUMMARY_FIELDS = tuple(
+    field for field in _APPOINTMENT_FIELDS if field not in _APPOINTMENT_TEXT_FIELDS
+)
+
+
+def _format_price(price_cents: int) -> str:
+    """Render a price in cents the way the response schema's Decimal price is rendered."""
+    return f"{price_cents // 100}.{price_cents % 100:02d}"
+
+
+def _serialize_appointment(
+    appointment,
+    client_name: Optional[str] = None,
+    service_name: Optional[str] = None,
+    staff_name: Optional[str] = None
+) -> dict:
+    """
+    Build the AppointmentResponseSchema payload for an appointment.
+    
+    Names default to the _appointment_queryset() annotations; callers holding
+    an instance built elsewhere pass the names they already have.
+    """
+    data = {field: getattr(appointment, field) for field in _APPOINTMENT_FIELDS}
+    data['price'] = _format_price(data.pop('price_cents'))
+    data['client_name'] = client_name if client_name is not None else appointment.client_name
+    data['service_name'] = service_name if service_name is not None else appointment.service_name
+    data['staff_name'] = staff_name if staff_name is not None else appointment.staff_name
+    return data
+
+
+def _estimated_appointment_count() -> Optional[int]:
+    """Return PostgreSQL's planner estimate of the appointments table size."""
+    if connection.vendor != 'postgresql':
+        return None
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+            [Appointment._meta.db_table]
+        )
+        row = cursor.fetchone()
+    
+    # reltuples is -1 until the table has been vacuumed or analyzed
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def _count_appointments(queryset, status: Optional[str], approximate: bool = False) -> int:
+    """Count appointments for the list endpoint, serving repeat requests from cache."""
+    if approximate and not status:
+        estimate = _estimated_appointment_count()
+        if estimate is not None:
+            return estimate
+    
+    cache_key = AppointmentService.count_cache_key(status)
+    total = cache.get(cache_key)
+    if total is None:
+        total = queryset.count()
+        cache.set(cache_key, total, APPOINTMENT_COUNT_CACHE_TTL)
+    return total
+
+
+def _refresh_availability(appointment) -> None:
+    """Invalidate the appointment's cached availability and re-warm it after commit."""
+    AppointmentService.invalidate_availability(
+        appointment.staff_member_id, appointment.scheduled_start_time
+    )
+    
+    target_date = timezone.localtime(appointment.scheduled_start_time).date().isoformat()
+    transaction.on_commit(lambda: warm_availability.delay(
+        appointment.staff_member_id, appointment.service_id, target_date
+    ))
+
+
+# Related-object columns read while creating an appointment and its confirmation
+_CREATE_CLIENT_FIELDS = ('id', 'first_name', 'last_name', 'full_name', 'email', 'phone')
+_CREATE_SERVICE_FIELDS = ('id', 'name', 'duration_minutes', 'preparation_time', 'cleanup_time')
+_CREATE_STAFF_FIELDS = ('id', 'user__id', 'user__first_name', 'user__last_name')
+
 
 @router.post("/", response=AppointmentResponseSchema, tags=["Appointments"])
 def create_appointment(request, data: AppointmentCreateSchema):
@@ -33,11 +163,29 @@ def create_appointment(request, data: AppointmentCreateSchema):
     Creates a new appointment with the provided information.
     Validates conflicts and returns the created appointment data.
     """
-    try:
-        # Get related objects
-        client = get_object_or_404(Client, id=data.client_id)
-        service = get_object_or_404(Service, id=data.service_id)
-        staff_member = get_object_or_404(StaffProfile, id=data.staff_member_id)
+    # Get related objects with only the columns the create path and its
+    # notifications read (staff user is joined for the response)
+    client = get_object_or_404(Client.objects.only(*_CREATE_CLIENT_FIELDS), id=data.client_id)
+    service = get_object_or_404(Service.objects.only(*_CREATE_SERVICE_FIELDS), id=data.service_id)
+    
+    # Validate duration matches service
+    time_diff = data.scheduled_end_time - data.scheduled_start_time
+    scheduled_duration = time_diff.total_seconds() / 60
+    service_duration = service.total_duration_minutes
+    if scheduled_duration != service_duration:
+        raise ValidationError(
+            f"Appointment duration ({scheduled_duration} minutes) must match service duration ({service_duration} minutes)"
+        )
+    
+    with transaction.atomic():
+        # Lock the staff row so bookings for one staff member are checked and
+        # written one at a time
+        staff_member = get_object_or_404(
+            StaffProfile.objects.select_related('user')
+            .only(*_CREATE_STAFF_FIELDS)
+            .select_for_update(of=('self',)),
+            id=data.staff_member_id
+        )
         
         # Validate appointment time
         is_valid, error_message = AppointmentService.validate_appointment_time(
@@ -46,45 +194,31 @@ def create_appointment(request, data: AppointmentCreateSchema):
         if not is_valid:
             raise ValidationError(error_message)
         
-        # Validate duration matches service
-        time_diff = data.scheduled_end_time - data.scheduled_start_time
-        scheduled_duration = time_diff.total_seconds() / 60
-        service_duration = service.total_duration_minutes
-        if scheduled_duration != service_duration:
-            raise ValidationError(
-                f"Appointment duration ({scheduled_duration} minutes) must match service duration ({service_duration} minutes)"
-            )
-        
-        # Create appointment
-        appointment_data = data.model_dump()
-        appointment = Appointment.objects.create(**appointment_data)
-        
-        # Return response with computed fields
-        return AppointmentResponseSchema(
-            id=appointment.id,
-            client_id=appointment.client_id,
-            service_id=appointment.service_id,
-            staff_member_id=appointment.staff_member_id,
-            scheduled_start_time=appointment.scheduled_start_time,
-            scheduled_end_time=appointment.scheduled_end_time,
-            status=appointment.status,
-            payment_status=appointment.payment_status,
-            price=appointment.price,
-            notes=appointment.notes,
-            cancellation_reason=appointment.cancellation_reason,
-            actual_start_time=appointment.actual_start_time,
-            actual_end_time=appointment.actual_end_time,
-            created_at=appointment.created_at,
-            updated_at=appointment.updated_at,
-            client_name=appointment.client.full_name,
-            service_name=appointment.service.name,
-            staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            duration_minutes=appointment.duration_minutes
+        # Create appointment from the already-fetched related objects
+        appointment_data = data.model_dump(
+            exclude={'client_id', 'service_id', 'staff_member_id'}, exclude_none=True
+        )
+        appointment = Appointment(
+            client=client,
+            service=service,
+            staff_member=staff_member,
+            **appointment_data
         )
-    except ValidationError as e:
-        raise ValidationError(f"Appointment creation failed: {e}")
-    except Exception as e:
-        raise Exception(f"Unexpected error creating appointment: {e}")
+        try:
+            appointment.save(force_insert=True, skip_clean=True)  # Validated above
+        except IntegrityError as e:
+            AppointmentService.raise_for_staff_overlap(e)
+        AppointmentService.invalidate_counts()
+        _refresh_availability(appointment)
+    
+    # Return response with names from the already-fetched related objects
+    staff_user = staff_member.user
+    return orjson_response(_serialize_appointment(
+        appointment,
+        client_name=client.full_name,
+        service_name=service.name,
+        staff_name=f"{staff_user.first_name} {staff_user.last_name}"
+    ))
 
 
 @router.get("/{appointment_id}", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -94,29 +228,9 @@ def get_appointment(request, appointment_id: int):
     
     Returns detailed appointment information including computed fields.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
-    )
+    appointment = get_object_or_404(_appointment_queryset(), id=appointment_id)
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.put("/{appointment_id}", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -128,18 +242,26 @@ def update_appointment(request, appointment_id: int, data: AppointmentUpdateSche
     Only provided fields will be updated (partial update).
     Validates conflicts if time is changed.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    try:
+    with transaction.atomic():
+        # Lock the appointment for the validate-then-save sequence
+        appointment = get_object_or_404(
+            _appointment_queryset().select_for_update(of=('self',)), id=appointment_id
+        )
+        original_staff_member_id = appointment.staff_member_id
+        original_start_time = appointment.scheduled_start_time
+        original_status = appointment.status
+        
         # Update only provided fields
         update_data = data.model_dump(exclude_unset=True)
         
         # If time is being updated, validate conflicts
         if 'scheduled_start_time' in update_data or 'scheduled_end_time' in update_data:
-            # Get the staff member (existing or new)
-            staff_member = appointment.staff_member
-            if 'staff_member_id' in update_data:
-                staff_member = get_object_or_404(StaffProfile, id=update_data['staff_member_id'])
+            # Lock the staff member (existing or new) so concurrent bookings
+            # for them wait for this update
+            staff_member = get_object_or_404(
+                StaffProfile.objects.select_for_update(),
+                id=update_data.get('staff_member_id', appointment.staff_member_id)
+            )
             
             # Get start and end times (existing or new)
             start_time = update_data.get('scheduled_start_time', appointment.scheduled_start_time)
@@ -156,34 +278,29 @@ def update_appointment(request, appointment_id: int, data: AppointmentUpdateSche
         for field, value in update_data.items():
             setattr(appointment, field, value)
         
-        appointment.full_clean()  # Validate model
-        appointment.save()
-        
-        return AppointmentResponseSchema(
-            id=appointment.id,
-            client_id=appointment.client_id,
-            service_id=appointment.service_id,
-            staff_member_id=appointment.staff_member_id,
-            scheduled_start_time=appointment.scheduled_start_time,
-            scheduled_end_time=appointment.scheduled_end_time,
-            status=appointment.status,
-            payment_status=appointment.payment_status,
-            price=appointment.price,
-            notes=appointment.notes,
-            cancellation_reason=appointment.cancellation_reason,
-            actual_start_time=appointment.actual_start_time,
-            actual_end_time=appointment.actual_end_time,
-            created_at=appointment.created_at,
-            updated_at=appointment.updated_at,
-            client_name=appointment.client.full_name,
-            service_name=appointment.service.name,
-            staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            duration_minutes=appointment.duration_minutes
-        )
-    except ValidationError as e:
-        raise ValidationError(f"Appointment update failed: {e}")
-    except Exception as e:
-        raise Exception(f"Unexpected error updating appointment: {e}")
+        # Only re-check the fields this request touched; the locked row
+        # already gives the status to validate the transition from
+        touched_fields = {_APPOINTMENT_FIELD_NAMES[field] for field in update_data}
+        appointment.clean_fields(exclude=set(_APPOINTMENT_FIELD_NAMES.values()) - touched_fields)
+        if touched_fields & {'scheduled_start_time', 'scheduled_end_time', 'service', 'price_cents'}:
+            appointment.validate_schedule()
+        appointment.validate_status_transition(original_status)
+        try:
+            appointment.save(update_fields=[*touched_fields, 'updated_at'], skip_clean=True)
+        except IntegrityError as e:
+            AppointmentService.raise_for_staff_overlap(e)
+        AppointmentService.invalidate_counts()
+        _refresh_availability(appointment)
+        if (original_staff_member_id, original_start_time) != (
+            appointment.staff_member_id, appointment.scheduled_start_time
+        ):
+            AppointmentService.invalidate_availability(original_staff_member_id, original_start_time)
+    
+    if update_data.keys() & {'client_id', 'service_id', 'staff_member_id'}:
+        # Reload so the annotated names follow the new related objects
+        appointment = _appointment_queryset().get(id=appointment_id)
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.delete("/{appointment_id}", tags=["Appointments"])
@@ -194,14 +311,16 @@ def delete_appointment(request, appointment_id: int):
     Permanently removes an appointment from the system.
     Use with caution - this action cannot be undone.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
+    appointment = get_object_or_404(_appointment_queryset(), id=appointment_id)
     appointment_details = {
-        "client": appointment.client.full_name,
-        "service": appointment.service.name,
-        "staff": f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
+        "client": appointment.client_name,
+        "service": appointment.service_name,
+        "staff": appointment.staff_name,
         "time": appointment.scheduled_start_time.isoformat()
     }
     appointment.delete()
+    AppointmentService.invalidate_counts()
+    _refresh_availability(appointment)
     
     return {
         "success": True,
@@ -211,12 +330,29 @@ def delete_appointment(request, appointment_id: int):
 
 
 @router.get("/", response=AppointmentListResponseSchema, tags=["Appointments"])
-def list_appointments(request, page: int = 1, page_size: int = 20, status: Optional[str] = None):
+def list_appointments(
+    request,
+    page: int = 1,
+    page_size: int = 20,
+    status: Optional[str] = None,
+    approximate_count: bool = False,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    include_notes: bool = False
+):
     """
     List all appointments with pagination.
     
     Returns a paginated list of all appointments in the system.
-    Optionally filter by status.
+    Optionally filter by status. Totals are cached for a minute; pass
+    approximate_count=true to use the database's row estimate for the
+    unfiltered list on very large tables.
+    
+    For deep pagination pass the next_before/next_before_id cursor from the
+    previous response as before/before_id instead of a page number; the page
+    is then read with an index range scan instead of skipping offset rows.
+    
+    Notes and cancellation reasons are returned empty unless include_notes=true.
     """
     # Validate pagination parameters
     if page < 1:
@@ -225,55 +361,99 @@ def list_appointments(request, page: int = 1, page_size: int = 20, status: Optio
         page_size = 20
     
     # Build query
-    queryset = Appointment.objects.all()
+    queryset = _appointment_queryset()
     
     # Filter by status if provided
     if status:
         queryset = queryset.filter(status=status)
     
     # Get total count
-    total = queryset.count()
+    total = _count_appointments(queryset, status, approximate=approximate_count)
     total_pages = math.ceil(total / page_size)
     
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
-    # Get appointments for current page
-    appointments = queryset.order_by('-scheduled_start_time')[offset:offset + page_size]
-    
-    # Convert to response schemas
-    appointment_list = [
-        AppointmentResponseSchema(
-            id=appointment.id,
-            client_id=appointment.client_id,
-            service_id=appointment.service_id,
-            staff_member_id=appointment.staff_member_id,
-            scheduled_start_time=appointment.scheduled_start_time,
-            scheduled_end_time=appointment.scheduled_end_time,
-            status=appointment.status,
-            payment_status=appointment.payment_status,
-            price=appointment.price,
-            notes=appointment.notes,
-            cancellation_reason=appointment.cancellation_reason,
-            actual_start_time=appointment.actual_start_time,
-            actual_end_time=appointment.actual_end_time,
-            created_at=appointment.created_at,
-            updated_at=appointment.updated_at,
-            client_name=appointment.client.full_name,
-            service_name=appointment.service.name,
-            staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            duration_minutes=appointment.duration_minutes
-        )
-        for appointment in appointments
-    ]
-    
-    return AppointmentListResponseSchema(
-        appointments=appointment_list,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
+    queryset = queryset.order_by('-scheduled_start_time', '-id')
+    
+    if before is not None:
+        # Keyset pagination: continue after the cursor row
+        cursor_query = Q(scheduled_start_time__lt=before)
+        if before_id is not None:
+            cursor_query |= Q(scheduled_start_time=before, id__lt=before_id)
+        queryset = queryset.filter(cursor_query)
+        offset = 0
+    else:
+        # Calculate offset
+        offset = (page - 1) * page_size
+    
+    # Get appointments for current page as plain rows, plus one to detect more
+    row_fields = _APPOINTMENT_FIELDS if include_notes else _APPOINTMENT_SUMMARY_FIELDS
+    rows = list(
+        queryset.values(*row_fields, *_APPOINTMENT_NAME_ANNOTATIONS)[offset:offset + page_size + 1]
     )
+    has_more = len(rows) > page_size
+    appointment_list = rows[:page_size]
+    for appointment_row in appointment_list:
+        appointment_row['price'] = _format_price(appointment_row.pop('price_cents'))
+        if not include_notes:
+            appointment_row.update(dict.fromkeys(_APPOINTMENT_TEXT_FIELDS, ''))
+    
+    next_before = next_before_id = None
+    if has_more:
+        last_row = appointment_list[-1]
+        next_before = last_row['scheduled_start_time']
+        next_before_id = last_row['id']
+    
+    return orjson_response({
+        'appointments': appointment_list,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': total_pages,
+        'has_more': has_more,
+        'next_before': next_before,
+        'next_before_id': next_before_id,
+    })
+
+
+def _transition_appointment(
+    appointment_id: int,
+    from_statuses,
+    to_status: str,
+    error_message: str,
+    **extra_fields
+):
+    """
+    Move an appointment to a new status with one conditional UPDATE.
+    
+    The expected current status is part of the WHERE clause, so concurrent
+    requests cannot both apply the same transition. When several statuses
+    are allowed, the current one is read first so the caller learns which
+    status the appointment actually left.
+    
+    Returns:
+        Tuple of the refreshed appointment, joined for the response, and
+        its status before the transition
+    """
+    if len(from_statuses) == 1:
+        old_status = from_statuses[0]
+    else:
+        old_status = Appointment.objects.filter(id=appointment_id).values_list('status', flat=True).first()
+        if old_status is None:
+            raise Http404("No Appointment matches the given query.")
+        if old_status not in from_statuses:
+            raise ValidationError(error_message)
+    
+    updated = Appointment.objects.filter(
+        id=appointment_id,
+        status=old_status
+    ).update(status=to_status, updated_at=timezone.now(), **extra_fields)
+    if not updated:
+        # Tell a missing appointment apart from one in the wrong status
+        if not Appointment.objects.filter(id=appointment_id).exists():
+            raise Http404("No Appointment matches the given query.")
+        raise ValidationError(error_message)
+    
+    AppointmentService.invalidate_counts()
+    return _appointment_queryset().get(id=appointment_id), old_status
 
 
 @router.post("/{appointment_id}/confirm", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -283,34 +463,15 @@ def confirm_appointment(request, appointment_id: int):
     
     Changes appointment status to 'confirmed'.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    if appointment.status != Appointment.AppointmentStatus.PENDING:
-        raise ValidationError("Only pending appointments can be confirmed")
-    
-    appointment.confirm()
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
+    appointment, old_status = _transition_appointment(
+        appointment_id,
+        [Appointment.AppointmentStatus.PENDING],
+        Appointment.AppointmentStatus.CONFIRMED,
+        "Only pending appointments can be confirmed"
     )
+    appointment.send_status_notifications(old_status)
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.post("/{appointment_id}/cancel", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -320,34 +481,21 @@ def cancel_appointment(request, appointment_id: int, reason: str = ""):
     
     Changes appointment status to 'cancelled' with optional reason.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    if appointment.status == Appointment.AppointmentStatus.COMPLETED:
-        raise ValidationError("Completed appointments cannot be cancelled")
-    
-    appointment.cancel(reason)
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
+    appointment, old_status = _transition_appointment(
+        appointment_id,
+        [
+            Appointment.AppointmentStatus.PENDING,
+            Appointment.AppointmentStatus.CONFIRMED,
+            Appointment.AppointmentStatus.IN_PROGRESS,
+        ],
+        Appointment.AppointmentStatus.CANCELLED,
+        "Only pending, confirmed or in-progress appointments can be cancelled",
+        cancellation_reason=reason
     )
+    _refresh_availability(appointment)
+    appointment.send_status_notifications(old_status)
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.post("/{appointment_id}/check-in", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -357,34 +505,15 @@ def check_in_appointment(request, appointment_id: int):
     
     Changes appointment status to 'checked_in' and records actual start time.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    if appointment.status != Appointment.AppointmentStatus.CONFIRMED:
-        raise ValidationError("Only confirmed appointments can be checked in")
-    
-    appointment.check_in()
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
+    appointment, _ = _transition_appointment(
+        appointment_id,
+        [Appointment.AppointmentStatus.CONFIRMED],
+        Appointment.AppointmentStatus.CHECKED_IN,
+        "Only confirmed appointments can be checked in",
+        actual_start_time=timezone.now()
     )
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.post("/{appointment_id}/start-service", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -394,34 +523,14 @@ def start_service(request, appointment_id: int):
     
     Changes appointment status to 'in_progress'.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    if appointment.status != Appointment.AppointmentStatus.CHECKED_IN:
-        raise ValidationError("Only checked-in appointments can start service")
-    
-    appointment.start_service()
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
+    appointment, _ = _transition_appointment(
+        appointment_id,
+        [Appointment.AppointmentStatus.CHECKED_IN],
+        Appointment.AppointmentStatus.IN_PROGRESS,
+        "Only checked-in appointments can start service"
     )
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.post("/{appointment_id}/complete", response=AppointmentResponseSchema, tags=["Appointments"])
@@ -431,34 +540,17 @@ def complete_appointment(request, appointment_id: int):
     
     Changes appointment status to 'completed' and records actual end time.
     """
-    appointment = get_object_or_404(Appointment, id=appointment_id)
-    
-    if appointment.status != Appointment.AppointmentStatus.IN_PROGRESS:
-        raise ValidationError("Only in-progress appointments can be completed")
-    
-    appointment.complete()
-    
-    return AppointmentResponseSchema(
-        id=appointment.id,
-        client_id=appointment.client_id,
-        service_id=appointment.service_id,
-        staff_member_id=appointment.staff_member_id,
-        scheduled_start_time=appointment.scheduled_start_time,
-        scheduled_end_time=appointment.scheduled_end_time,
-        status=appointment.status,
-        payment_status=appointment.payment_status,
-        price=appointment.price,
-        notes=appointment.notes,
-        cancellation_reason=appointment.cancellation_reason,
-        actual_start_time=appointment.actual_start_time,
-        actual_end_time=appointment.actual_end_time,
-        created_at=appointment.created_at,
-        updated_at=appointment.updated_at,
-        client_name=appointment.client.full_name,
-        service_name=appointment.service.name,
-        staff_name=f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-        duration_minutes=appointment.duration_minutes
+    appointment, _ = _transition_appointment(
+        appointment_id,
+        [Appointment.AppointmentStatus.IN_PROGRESS],
+        Appointment.AppointmentStatus.COMPLETED,
+        "Only in-progress appointments can be completed",
+        actual_end_time=timezone.now(),
+        payment_status=Appointment.PaymentStatus.PAID
     )
+    _refresh_availability(appointment)
+    
+    return orjson_response(_serialize_appointment(appointment))
 
 
 @router.get("/availability/", response=AvailableSlotsResponseSchema, tags=["Appointments"])
@@ -467,66 +559,37 @@ def check_availability(request, data: AvailabilityCheckSchema):
     Check available time slots for a staff member on a specific date.
     
     Returns available time slots based on staff working hours and existing appointments.
+    With packed=true the slots come back as a bitmask counted from the first free slot.
+    Responses are cached for a minute and dropped when the staff member's day changes.
     """
+    # Parse date first so every accepted spelling shares the key invalidation bumps
     try:
-        # Get related objects
-        staff_member = get_object_or_404(StaffProfile, id=data.staff_member_id)
-        service = get_object_or_404(Service, id=data.service_id)
-        
-        # Parse date
-        date = datetime.strptime(data.date, "%Y-%m-%d").date()
-        
-        # Get working hours for the staff member on this day
-        day_of_week = date.isoweekday()  # 1=Monday, 7=Sunday
-        
-        try:
-            working_hours = staff_member.working_hours.get(
-                day_of_week=day_of_week,
-                is_available=True
-            )
-        except Exception:
-            # Staff is not available on this day
-            return AvailableSlotsResponseSchema(
-                date=data.date,
-                staff_member_id=staff_member.id,
-                staff_member_name=f"{staff_member.user.first_name} {staff_member.user.last_name}",
-                service_id=service.id,
-                service_name=service.name,
-                service_duration=service.total_duration_minutes,
-                available_slots=[]
-            )
-        
-        # Create datetime objects for working hours
-        working_start = datetime.combine(date, working_hours.start_time)
-        working_end = datetime.combine(date, working_hours.end_time)
-        
-        # Get available time slots
-        available_slots = AppointmentService.get_available_time_slots(
-            staff_member,
-            datetime.combine(date, datetime.min.time()),
-            service.total_duration_minutes,
-            working_start,
-            working_end
-        )
-        
-        # Format time slots as strings
-        formatted_slots = []
-        for start_time, end_time in available_slots:
-            formatted_slots.append(start_time.strftime("%H:%M"))
-        
-        return AvailableSlotsResponseSchema(
-            date=data.date,
-            staff_member_id=staff_member.id,
-            staff_member_name=f"{staff_member.user.first_name} {staff_member.user.last_name}",
-            service_id=service.id,
-            service_name=service.name,
-            service_duration=service.total_duration_minutes,
-            available_slots=formatted_slots
-        )
-    except ValidationError as e:
-        raise ValidationError(f"Availability check failed: {e}")
-    except Exception as e:
-        raise Exception(f"Unexpected error checking availability: {e}")
+        parsed_date = date.fromisoformat(data.date)
+    except ValueError:
+        raise ValidationError("date must be YYYY-MM-DD")
+    
+    cache_key = AppointmentService.availability_cache_key(
+        data.staff_member_id, data.service_id, parsed_date.isoformat()
+    )
+    cached_response = cache.get(cache_key)
+    if cached_response is not None:
+        logger.debug(f"Availability cache hit: {cache_key}")
+        if data.packed:
+            cached_response = AppointmentService.pack_availability(cached_response)
+        return orjson_response(cached_response)
+    logger.debug(f"Availability cache miss: {cache_key}")
+    
+    # Get related objects
+    staff_member = get_object_or_404(
+        StaffProfile.objects.select_related('user'), id=data.staff_member_id
+    )
+    service = get_object_or_404(Service, id=data.service_id)
+    
+    response = AppointmentService.get_availability(staff_member, service, parsed_date)
+    cache.set(cache_key, response, AVAILABILITY_CACHE_TTL)
+    if data.packed:
+        response = AppointmentService.pack_availability(response)
+    return orjson_response(response)
 
 
 # Health check endpoint
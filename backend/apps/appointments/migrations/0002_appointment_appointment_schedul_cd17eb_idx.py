@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-14 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+        ('clients', '0001_mvp_client_model'),
+        ('services', '0001_initial'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['-scheduled_start_time', '-id'], name='appointment_schedul_cd17eb_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-14 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_appointment_appointment_schedul_cd17eb_idx'),
+        ('clients', '0001_mvp_client_model'),
+        ('services', '0001_initial'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_status_9fecd6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_staff_m_ab7009_idx',
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', '-scheduled_start_time'], name='appointment_status_5ce410_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['staff_member', 'scheduled_start_time'], name='appointment_staff_m_b70965_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-14 06:05
+
+from django.db import migrations, models
+
+
+def backfill_duration_minutes(apps, schema_editor):
+    """Store the scheduled duration of existing appointments."""
+    Appointment = apps.get_model('appointments', 'Appointment')
+    batch = []
+    for appointment in Appointment.objects.only(
+        'id', 'scheduled_start_time', 'scheduled_end_time'
+    ).iterator(chunk_size=1000):
+        time_diff = appointment.scheduled_end_time - appointment.scheduled_start_time
+        appointment.duration_minutes = int(time_diff.total_seconds() // 60)
+        batch.append(appointment)
+        if len(batch) >= 1000:
+            Appointment.objects.bulk_update(batch, ['duration_minutes'])
+            batch = []
+    if batch:
+        Appointment.objects.bulk_update(batch, ['duration_minutes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Scheduled duration in minutes (derived from the scheduled times)'),
+        ),
+        migrations.RunPython(backfill_duration_minutes, migrations.RunPython.noop),
+    ]
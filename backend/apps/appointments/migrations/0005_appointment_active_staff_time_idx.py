@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-14 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_duration_minutes'),
+        ('clients', '0001_mvp_client_model'),
+        ('services', '0001_initial'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed', 'checked_in', 'in_progress'])), fields=['staff_member', 'scheduled_start_time'], name='appt_active_staff_time_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+"""
+Prevent overlapping active appointments per staff member at the database level.
+
+PostgreSQL only: the exclusion constraint needs btree_gist and tstzrange, so
+other backends (the SQLite development database) skip it and rely on
+AppointmentService's conflict checks. The extension is created if missing but
+left installed on rollback, since other objects may depend on it.
+"""
+
+from django.db import migrations
+
+
+CREATE_BTREE_GIST = "CREATE EXTENSION IF NOT EXISTS btree_gist"
+
+ADD_NO_STAFF_OVERLAP = """
+ALTER TABLE appointments ADD CONSTRAINT no_staff_overlap EXCLUDE USING gist (
+    staff_member_id WITH =,
+    tstzrange(scheduled_start_time, scheduled_end_time, '[)') WITH &&
+) WHERE (
+    NOT is_deleted
+    AND status IN ('pending', 'confirmed', 'checked_in', 'in_progress')
+)
+"""
+
+DROP_NO_STAFF_OVERLAP = "ALTER TABLE appointments DROP CONSTRAINT IF EXISTS no_staff_overlap"
+
+
+def add_no_staff_overlap(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_BTREE_GIST)
+        schema_editor.execute(ADD_NO_STAFF_OVERLAP)
+
+
+def drop_no_staff_overlap(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_NO_STAFF_OVERLAP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointment_active_staff_time_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_no_staff_overlap, drop_no_staff_overlap),
+    ]
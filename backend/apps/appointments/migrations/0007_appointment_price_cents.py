@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-14 06:19
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Round
+
+
+def copy_price_to_cents(apps, schema_editor):
+    """Convert existing prices to whole cents."""
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Appointment.objects.update(
+        price_cents=Cast(Round(models.F('price') * 100), models.PositiveIntegerField())
+    )
+
+
+def copy_cents_to_price(apps, schema_editor):
+    """Restore prices from whole cents."""
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Appointment.objects.update(
+        price=Cast(models.F('price_cents'), models.DecimalField(max_digits=8, decimal_places=2)) / 100
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_appointment_no_staff_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='price_cents',
+            field=models.PositiveIntegerField(default=0, help_text='Final price for the appointment, in cents'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_price_to_cents, copy_cents_to_price),
+        migrations.RemoveConstraint(
+            model_name='appointment',
+            name='positive_appointment_price',
+        ),
+        migrations.RemoveField(
+            model_name='appointment',
+            name='price',
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.CheckConstraint(condition=models.Q(('price_cents__gte', 0)), name='positive_appointment_price'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+"""
+Reject invalid appointment status transitions at the database level.
+
+PostgreSQL only: the trigger is written in PL/pgSQL, so other backends (the
+SQLite development database) skip it and rely on Appointment's Python checks.
+The transition list mirrors _VALID_STATUS_TRANSITIONS in appointments.models.
+"""
+
+from django.db import migrations
+
+
+ADD_STATUS_TRANSITION_TRIGGER = """
+CREATE OR REPLACE FUNCTION appointments_check_status_transition() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status IS DISTINCT FROM OLD.status AND (OLD.status, NEW.status) NOT IN (
+        ('pending', 'confirmed'),
+        ('pending', 'cancelled'),
+        ('confirmed', 'checked_in'),
+        ('confirmed', 'cancelled'),
+        ('confirmed', 'no_show'),
+        ('checked_in', 'in_progress'),
+        ('checked_in', 'no_show'),
+        ('in_progress', 'completed'),
+        ('in_progress', 'cancelled'),
+        ('cancelled', 'pending'),
+        ('no_show', 'pending')
+    ) THEN
+        RAISE EXCEPTION 'Invalid status transition from % to %', OLD.status, NEW.status
+            USING ERRCODE = 'check_violation', CONSTRAINT = 'valid_status_transition';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER appointments_status_transition
+    BEFORE UPDATE OF status ON appointments
+    FOR EACH ROW EXECUTE FUNCTION appointments_check_status_transition();
+"""
+
+DROP_STATUS_TRANSITION_TRIGGER = """
+DROP TRIGGER IF EXISTS appointments_status_transition ON appointments;
+DROP FUNCTION IF EXISTS appointments_check_status_transition();
+"""
+
+
+def add_status_transition_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # No params, so the driver leaves RAISE's % placeholders alone
+        schema_editor.execute(ADD_STATUS_TRANSITION_TRIGGER, params=None)
+
+
+def drop_status_transition_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_STATUS_TRANSITION_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_appointment_price_cents'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_status_transition_trigger, drop_status_transition_trigger),
+    ]
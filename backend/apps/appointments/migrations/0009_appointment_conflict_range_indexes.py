@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-14 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_appointment_status_transition_trigger'),
+        ('clients', '0001_mvp_client_model'),
+        ('services', '0001_initial'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_client__2834cc_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_staff_m_b70965_idx',
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['client', 'scheduled_start_time', 'scheduled_end_time'], name='appointment_client__28c9ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['staff_member', 'scheduled_start_time', 'scheduled_end_time'], name='appointment_staff_m_838206_idx'),
+        ),
+    ]
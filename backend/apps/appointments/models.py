@@ -3,21 +3,57 @@ Appointment models for Mario Beauty Salon Management System.
 Provides appointment scheduling with conflict prevention and status tracking.
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.db import connection
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
+from functools import partial
 
-from apps.core.models import BaseModel
+from apps.core.models import BaseModel, SalonManager
 from apps.clients.models import Client
 from apps.services.models import Service
 from apps.staff.models import StaffProfile
 
 
 
+def format_datetime(value) -> str:
+    """Format a datetime as YYYY-MM-DD HH:MM without going through strftime."""
+    return f"{value.year:04d}-{value.month:02d}-{value.day:02d} {value.hour:02d}:{value.minute:02d}"
+
+
+# Statuses reached once an appointment has been confirmed
+_CONFIRMED_STATUSES = frozenset({'confirmed', 'checked_in', 'in_progress', 'completed'})
+
+# Allowed status changes keyed by the current status (raw TextChoices values);
+# migration 0008 enforces the same list with a PostgreSQL trigger
+_VALID_STATUS_TRANSITIONS = {
+    'pending': frozenset({'confirmed', 'cancelled'}),
+    'confirmed': frozenset({'checked_in', 'cancelled', 'no_show'}),
+    'checked_in': frozenset({'in_progress', 'no_show'}),
+    'in_progress': frozenset({'completed', 'cancelled'}),
+    'completed': frozenset(),
+    'cancelled': frozenset({'pending'}),  # Allow rebooking
+    'no_show': frozenset({'pending'}),  # Allow rebooking
+}
+
+
+class AppointmentManager(SalonManager):
+    """
+    Appointment manager excluding soft deleted records.
+    Adds with_relations() for code that reads client, service and staff details.
+    """
+    
+    # Relations read when building responses and validating updates
+    RELATED_FIELDS = ('client', 'service', 'staff_member__user')
+    
+    def with_relations(self):
+        """Return appointments joined with their client, service and staff user."""
+        return self.get_queryset().select_related(*self.RELATED_FIELDS)
+
+
 class Appointment(BaseModel):
     """
     Appointment model with status tracking and conflict prevention.
@@ -36,6 +72,14 @@ class Appointment(BaseModel):
         CANCELLED = 'cancelled', _('Cancelled')
         NO_SHOW = 'no_show', _('No Show')
     
+    # Statuses that still occupy the staff member's time slot
+    ACTIVE_STATUSES = (
+        AppointmentStatus.PENDING,
+        AppointmentStatus.CONFIRMED,
+        AppointmentStatus.CHECKED_IN,
+        AppointmentStatus.IN_PROGRESS,
+    )
+    
     class PaymentStatus(models.TextChoices):
         """
         Define payment status options.
@@ -76,6 +120,12 @@ class Appointment(BaseModel):
         help_text="Scheduled end time for the appointment"
     )
     
+    duration_minutes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Scheduled duration in minutes (derived from the scheduled times)"
+    )
+    
     # Status tracking
     status = models.CharField(
         max_length=20,
@@ -92,10 +142,8 @@ class Appointment(BaseModel):
     )
     
     # Pricing and notes
-    price = models.DecimalField(
-        max_digits=8,
-        decimal_places=2,
-        help_text="Final price for the appointment"
+    price_cents = models.PositiveIntegerField(
+        help_text="Final price for the appointment, in cents"
     )
     
     notes = models.TextField(
@@ -122,6 +170,8 @@ class Appointment(BaseModel):
         help_text="Actual end time of the service"
     )
     
+    objects = AppointmentManager()
+    
     class Meta(BaseModel.Meta):  # type: ignore
         db_table = 'appointments'
         verbose_name = _('Appointment')
@@ -129,11 +179,23 @@ class Appointment(BaseModel):
         ordering = ['-scheduled_start_time']
         indexes = [
             models.Index(fields=['scheduled_start_time']),
-            models.Index(fields=['status']),
-            models.Index(fields=['client']),
-            models.Index(fields=['staff_member']),
+            models.Index(fields=['-scheduled_start_time', '-id']),  # Keyset pagination
+            models.Index(fields=['status', '-scheduled_start_time']),  # Status filter, newest first
+            # Conflict checks probe both ends of the range from the index alone
+            models.Index(fields=['client', 'scheduled_start_time', 'scheduled_end_time']),
+            models.Index(fields=['staff_member', 'scheduled_start_time', 'scheduled_end_time']),
             models.Index(fields=['service']),
+            # Availability scans only look at appointments that still hold their
+            # slot; the status list mirrors ACTIVE_STATUSES
+            models.Index(
+                fields=['staff_member', 'scheduled_start_time'],
+                condition=models.Q(status__in=['pending', 'confirmed', 'checked_in', 'in_progress']),
+                name='appt_active_staff_time_idx'
+            ),
         ]
+        # PostgreSQL also enforces no_staff_overlap, an exclusion constraint over
+        # active appointments' time ranges (see migration 0006); it is not declared
+        # here because other backends cannot create it
         constraints = [
             # Ensure appointment times are valid
             models.CheckConstraint(
@@ -142,7 +204,7 @@ class Appointment(BaseModel):
             ),
             # Ensure price is positive
             models.CheckConstraint(
-                check=models.Q(price__gte=Decimal('0.00')),
+                check=models.Q(price_cents__gte=0),
                 name='positive_appointment_price'
             ),
         ]
@@ -151,13 +213,23 @@ class Appointment(BaseModel):
         client_name = f"{self.client.first_name} {self.client.last_name}"  # type: ignore
         staff_name = f"{self.staff_member.user.first_name} {self.staff_member.user.last_name}"  # type: ignore
         service_name = self.service.name  # type: ignore
-        appointment_time = self.scheduled_start_time.strftime('%Y-%m-%d %H:%M')  # type: ignore
+        appointment_time = format_datetime(self.scheduled_start_time)  # type: ignore
         return f"{client_name} - {service_name} with {staff_name} on {appointment_time}"
     
     def clean(self):
         """Model validation."""
         super().clean()
+        self.validate_schedule()
         
+        # Validate status transitions
+        if self.pk:  # Only for existing appointments
+            original_status = Appointment.objects_with_deleted.filter(
+                pk=self.pk
+            ).values_list('status', flat=True).first()
+            self.validate_status_transition(original_status)
+    
+    def validate_schedule(self):
+        """Validate the scheduled times and price."""
         # Validate appointment time range
         if self.scheduled_start_time and self.scheduled_end_time:
             if self.scheduled_start_time >= self.scheduled_end_time:
@@ -171,101 +243,100 @@ class Appointment(BaseModel):
                 raise ValidationError(f"Appointment duration ({scheduled_duration} minutes) must match service duration ({service_duration} minutes)")
         
         # Validate price is reasonable
-        if self.price and self.price < Decimal('0.00'):
+        if self.price_cents is not None and self.price_cents < 0:
             raise ValidationError("Price cannot be negative")
-        
-        # Validate status transitions
-        if self.pk:  # Only for existing appointments
-            try:
-                original = Appointment.objects_with_deleted.get(pk=self.pk)
-                if not self._is_valid_status_transition(original.status, self.status):
-                    raise ValidationError(f"Invalid status transition from {original.status} to {self.status}")
-            except Appointment.DoesNotExist:
-                pass  # New appointment, no transition validation needed
+    
+    def validate_status_transition(self, original_status):
+        """Validate the change from the stored status (None for a new appointment)."""
+        if (original_status is not None and original_status != self.status and
+            not self._is_valid_status_transition(original_status, self.status)):
+            raise ValidationError(f"Invalid status transition from {original_status} to {self.status}")
     
     def _is_valid_status_transition(self, from_status, to_status):
         """Validate appointment status transitions."""
-        valid_transitions = {
-            self.AppointmentStatus.PENDING: [self.AppointmentStatus.CONFIRMED, self.AppointmentStatus.CANCELLED],
-            self.AppointmentStatus.CONFIRMED: [self.AppointmentStatus.CHECKED_IN, self.AppointmentStatus.CANCELLED, self.AppointmentStatus.NO_SHOW],
-            self.AppointmentStatus.CHECKED_IN: [self.AppointmentStatus.IN_PROGRESS, self.AppointmentStatus.NO_SHOW],
-            self.AppointmentStatus.IN_PROGRESS: [self.AppointmentStatus.COMPLETED, self.AppointmentStatus.CANCELLED],
-            self.AppointmentStatus.COMPLETED: [],
-            self.AppointmentStatus.CANCELLED: [self.AppointmentStatus.PENDING],  # Allow rebooking
-            self.AppointmentStatus.NO_SHOW: [self.AppointmentStatus.PENDING],  # Allow rebooking
-        }
-        
-        return to_status in valid_transitions.get(from_status, [])
+        return to_status in _VALID_STATUS_TRANSITIONS.get(from_status, frozenset())
     
-    def save(self, *args, **kwargs):
-        """Override save to perform additional validation."""
+    def save(self, *args, skip_clean=False, **kwargs):
+        """
+        Override save to perform additional validation.
+        
+        Pass skip_clean=True when the caller has already validated the
+        instance (the API endpoints do); the stored status is still read for
+        notifications.
+        """
         is_new = self.pk is None
         old_status = None
         
         # Get old status if this is an update
         if not is_new:
-            try:
-                old_instance = Appointment.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except Appointment.DoesNotExist:
-                pass
+            old_status = Appointment.objects_with_deleted.filter(
+                pk=self.pk
+            ).values_list('status', flat=True).first()
+        
+        if not skip_clean:
+            # Same checks as clean(), reusing the status read above
+            self.validate_schedule()
+            self.validate_status_transition(old_status)
+        
+        # Store the scheduled duration alongside the times it is derived from
+        if self.scheduled_start_time and self.scheduled_end_time:
+            time_diff = self.scheduled_end_time - self.scheduled_start_time  # type: ignore
+            self.duration_minutes = int(time_diff.total_seconds() // 60)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'scheduled_start_time', 'scheduled_end_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'duration_minutes'}
         
-        self.clean()
         super().save(*args, **kwargs)
         
-        # Trigger notifications for new appointments or status changes
-        try:
-            from apps.notifications.services import NotificationService
-            
-            # Prepare appointment details for notification
-            appointment_details = {
-                'service_name': self.service.name,
-                'datetime': self.scheduled_start_time.strftime('%Y-%m-%d %H:%M'),
-                'staff_name': f"{self.staff_member.user.first_name} {self.staff_member.user.last_name}",
-                'duration': self.service.duration_minutes,
-                'price': float(self.price),
-            }
-            
-            # Handle status changes
-            if is_new:
-                # Send confirmation for new appointments
-                NotificationService.send_appointment_confirmation(
-                    client=self.client,
-                    appointment_details=appointment_details
-                )
-            elif old_status != self.status:
-                if (old_status == Appointment.AppointmentStatus.PENDING and 
-                    self.status == Appointment.AppointmentStatus.CONFIRMED):
-                    # Send confirmation when appointment is confirmed
-                    NotificationService.send_appointment_confirmation(
-                        client=self.client,
-                        appointment_details=appointment_details
-                    )
-                elif self.status == Appointment.AppointmentStatus.CANCELLED:
-                    # Add cancellation reason to details
-                    appointment_details['cancellation_reason'] = self.cancellation_reason or "No reason provided"
-                    # Send cancellation notification
-                    NotificationService.send_appointment_cancellation(
-                        client=self.client,
-                        appointment_details=appointment_details
-                    )
-        except (ImportError, AttributeError):
-            # Handle case where notification service is not available
-            pass
+        self.send_status_notifications(old_status, is_new=is_new)
+    
+    def send_status_notifications(self, old_status, is_new=False):
+        """
+        Notify the client about a new appointment or a status change.
+        
+        Called from save(), and by callers that change status with a
+        queryset update() instead of saving the instance. Notifications are
+        sent by background tasks once the surrounding transaction commits.
+        """
+        from apps.appointments import tasks
+        
+        # Handle status changes
+        if is_new:
+            # Send confirmation for new appointments
+            task = tasks.send_appointment_confirmation
+        elif old_status == self.status:
+            return
+        elif (old_status == Appointment.AppointmentStatus.PENDING and 
+              self.status == Appointment.AppointmentStatus.CONFIRMED):
+            # Send confirmation when appointment is confirmed
+            task = tasks.send_appointment_confirmation
+        elif self.status == Appointment.AppointmentStatus.CANCELLED:
+            # Send cancellation notification
+            task = tasks.send_appointment_cancellation
+        else:
+            return
+        
+        transaction.on_commit(partial(task.delay, self.pk))
     
     @property
-    def duration_minutes(self):
-        """Calculate appointment duration in minutes."""
-        if self.scheduled_start_time and self.scheduled_end_time:
-            time_diff = self.scheduled_end_time - self.scheduled_start_time  # type: ignore
-            return time_diff.total_seconds() / 60
-        return 0
+    def price(self):
+        """Final price as a Decimal, for display and arithmetic in currency units."""
+        if self.price_cents is None:
+            return None
+        return Decimal(self.price_cents).scaleb(-2)
+    
+    @price.setter
+    def price(self, value):
+        """Store a price given in currency units (Decimal, str or float) as cents."""
+        if value is None:
+            self.price_cents = None
+        else:
+            self.price_cents = int((Decimal(str(value)) * 100).to_integral_value())
     
     @property
     def is_confirmed(self):
         """Check if appointment is confirmed."""
-        return self.status in [self.AppointmentStatus.CONFIRMED, self.AppointmentStatus.CHECKED_IN, 
-                              self.AppointmentStatus.IN_PROGRESS, self.AppointmentStatus.COMPLETED]
+        return self.status in _CONFIRMED_STATUSES
     
     @property
     def is_cancelled(self):
@@ -5,9 +5,18 @@ Provides request/response validation and serialization for the Appointment manag
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationInfo
 from decimal import Decimal
 
+from django.utils import timezone
+
+
+def _validation_now(info: ValidationInfo) -> datetime:
+    """Return the 'now' shared through the validation context, or the current time."""
+    if info.context and 'now' in info.context:
+        return info.context['now']
+    return timezone.now()
+
 
 class AppointmentCreateSchema(BaseModel):
     """
@@ -39,6 +48,7 @@ class AppointmentCreateSchema(BaseModel):
     
     price: Decimal = Field(
         gt=0,
+        decimal_places=2,
         description="Final price for the appointment"
     )
     
@@ -49,10 +59,9 @@ class AppointmentCreateSchema(BaseModel):
     
     @field_validator('scheduled_start_time', 'scheduled_end_time')
     @classmethod
-    def validate_future_time(cls, v):
+    def validate_future_time(cls, v, info: ValidationInfo):
         """Validate that appointment times are not in the past."""
-        from django.utils import timezone
-        if v < timezone.now():
+        if v < _validation_now(info):
             raise ValueError('Appointment times cannot be in the past')
         return v
     
@@ -126,6 +135,7 @@ class AppointmentUpdateSchema(BaseModel):
     price: Optional[Decimal] = Field(
         default=None,
         gt=0,
+        decimal_places=2,
         description="Final price for the appointment"
     )
     
@@ -141,11 +151,10 @@ class AppointmentUpdateSchema(BaseModel):
     
     @field_validator('scheduled_start_time', 'scheduled_end_time')
     @classmethod
-    def validate_future_time(cls, v):
+    def validate_future_time(cls, v, info: ValidationInfo):
         """Validate that appointment times are not in the past."""
         if v is not None:
-            from django.utils import timezone
-            if v < timezone.now():
+            if v < _validation_now(info):
                 raise ValueError('Appointment times cannot be in the past')
         return v
     
@@ -232,6 +241,15 @@ class AppointmentListResponseSchema(BaseModel):
     page: int = Field(description="Current page number")
     page_size: int = Field(description="Number of appointments per page")
     total_pages: int = Field(description="Total number of pages")
+    has_more: bool = Field(default=False, description="Whether more appointments follow this page")
+    next_before: Optional[datetime] = Field(
+        default=None,
+        description="Cursor: pass as 'before' to fetch the next page"
+    )
+    next_before_id: Optional[int] = Field(
+        default=None,
+        description="Cursor: pass as 'before_id' to fetch the next page"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -262,7 +280,10 @@ class AppointmentListResponseSchema(BaseModel):
                 "total": 150,
                 "page": 1,
                 "page_size": 20,
-                "total_pages": 8
+                "total_pages": 8,
+                "has_more": True,
+                "next_before": "2024-02-15T10:00:00Z",
+                "next_before_id": 1
             }
         }
     )
@@ -287,6 +308,11 @@ class AvailabilityCheckSchema(BaseModel):
         description="ID of the service to be provided"
     )
     
+    packed: bool = Field(
+        default=False,
+        description="Return the free slots as a bitmask instead of a list of times"
+    )
+    
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -309,7 +335,18 @@ class AvailableSlotsResponseSchema(BaseModel):
     service_id: int = Field(description="ID of the service")
     service_name: str = Field(description="Name of the service")
     service_duration: int = Field(description="Duration of the service in minutes")
-    available_slots: List[str] = Field(description="List of available time slots in HH:MM format")
+    available_slots: Optional[List[str]] = Field(
+        default=None,
+        description="List of available time slots in HH:MM format (omitted when packed)"
+    )
+    first_available_slot: Optional[str] = Field(
+        default=None,
+        description="Earliest available slot in HH:MM format (packed responses only)"
+    )
+    available_slot_mask: Optional[int] = Field(
+        default=None,
+        description="Bit i set = slot starting 30*i minutes after first_available_slot is free (packed responses only)"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
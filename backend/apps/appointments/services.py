@@ -4,15 +4,86 @@ Provides business logic for appointment validation, conflict detection, and sche
 """
 
 from django.utils import timezone
-from django.db.models import Q
-from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Count, Q
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import accumulate
 from typing import List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
 import logging
+import math
+import time
 
 from .models import Appointment
+from .schemas import AppointmentCreateSchema
+from apps.clients.models import Client
+from apps.services.models import Service
+from apps.staff.models import StaffProfile
+from apps.staff.services import WorkingHoursService
 
 logger = logging.getLogger(__name__)
 
+# Availability responses are cached per staff member and day; a version stamp
+# in the key lets one write drop every service variant for that day at once.
+AVAILABILITY_CACHE_TTL = 60  # seconds
+# Version stamps only need to outlive the entries they version; once one
+# expires the version falls back to 0, whose entries are long gone by then.
+AVAILABILITY_VERSION_TTL = AVAILABILITY_CACHE_TTL * 10
+
+# List totals are cached briefly and dropped on every appointment mutation
+APPOINTMENT_COUNT_CACHE_TTL = 60  # seconds
+
+# Status filters shared by the conflict and availability queries
+_CANCELLED_STATUS = Appointment.AppointmentStatus.CANCELLED.value
+_NOT_CANCELLED = ~Q(status=_CANCELLED_STATUS)
+_ACTIVE_STATUSES = tuple(status.value for status in Appointment.ACTIVE_STATUSES)
+
+# Validates a whole batch of create payloads in one pass
+_APPOINTMENT_CREATE_LIST_ADAPTER = TypeAdapter(List[AppointmentCreateSchema])
+
+# Keep each bulk INSERT under PostgreSQL's 65535 bind-parameter limit
+_BULK_CREATE_BATCH_SIZE = 65535 // len(Appointment._meta.concrete_fields)
+
+
+def _busy_minutes_bitmap(booked_times, window_start: datetime, window_minutes: int) -> int:
+    """
+    Build a bitmap of the booked minutes in a working window.
+    
+    Bit n is set when minute n after window_start overlaps a booking. Partial
+    minutes count as booked, so a slot on whole minutes conflicts with the
+    bitmap exactly when it overlaps a booking.
+    """
+    busy = 0
+    for start_time, end_time in booked_times:
+        first = math.floor((start_time - window_start).total_seconds() / 60)
+        last = math.ceil((end_time - window_start).total_seconds() / 60)
+        first, last = max(first, 0), min(last, window_minutes)
+        if first < last:
+            busy |= ((1 << (last - first)) - 1) << first
+    return busy
+
+
+def _conflict_q(field: str, value, start_time: datetime, end_time: datetime,
+                exclude_appointment_id: Optional[int] = None) -> Q:
+    """
+    Build the conflict filter for one side of a booking.
+    
+    Matches non-cancelled appointments whose `field` is `value` and that
+    overlap the given time slot, skipping `exclude_appointment_id` (for updates).
+    """
+    conflict_query = Q(**{
+        field: value,
+        'scheduled_start_time__lt': end_time,
+        'scheduled_end_time__gt': start_time,
+    }) & _NOT_CANCELLED
+    if exclude_appointment_id:
+        return conflict_query & ~Q(id=exclude_appointment_id)
+    return conflict_query
+
 
 class AppointmentService:
     """Service class for appointment-related business logic."""
@@ -37,28 +108,67 @@ class AppointmentService:
             bool: True if staff is available, False if there's a conflict
         """
         try:
-            # Build conflict query
-            conflict_query = Q(
-                staff_member=staff_member,
-                scheduled_start_time__lt=end_time,
-                scheduled_end_time__gt=start_time
+            conflict_query = _conflict_q(
+                'staff_member', staff_member, start_time, end_time, exclude_appointment_id
             )
             
-            # Exclude specific appointment if provided (for updates)
-            if exclude_appointment_id:
-                conflict_query &= ~Q(id=exclude_appointment_id)
-            
-            # Exclude cancelled appointments from conflict checking
-            conflict_query &= ~Q(status=Appointment.AppointmentStatus.CANCELLED)
-            
             # Check for conflicts
             conflicts = Appointment.objects.filter(conflict_query).exists()
             
             return not conflicts
-        except Exception as e:
+        except DatabaseError as e:
             logger.error(f"Error checking staff availability: {e}")
             return False
     
+    @staticmethod
+    def check_staff_availability_bulk(
+        staff_member,
+        candidates: List[Tuple[datetime, datetime]],
+        exclude_appointment_id: Optional[int] = None
+    ) -> List[bool]:
+        """
+        Check many candidate time slots for a staff member with one query.
+        
+        Args:
+            staff_member: StaffProfile instance
+            candidates: (start, end) time slots to check
+            exclude_appointment_id: Appointment ID to exclude from conflict check (for updates)
+            
+        Returns:
+            List[bool]: True for each candidate the staff member is available for
+        """
+        if not candidates:
+            return []
+        
+        try:
+            # Fetch every booking that could overlap any candidate, oldest first
+            bookings = Appointment.objects.filter(
+                staff_member=staff_member,
+                scheduled_start_time__lt=max(end for _, end in candidates),
+                scheduled_end_time__gt=min(start for start, _ in candidates)
+            ).exclude(status=_CANCELLED_STATUS)
+            if exclude_appointment_id:
+                bookings = bookings.exclude(id=exclude_appointment_id)
+            bookings = list(
+                bookings.order_by('scheduled_start_time')
+                .values_list('scheduled_start_time', 'scheduled_end_time')
+            )
+            
+            # latest_ends[i] is the latest end among the first i + 1 bookings, so a
+            # candidate conflicts when some booking starting before its end also
+            # ends after its start
+            starts = [start for start, _ in bookings]
+            latest_ends = list(accumulate((end for _, end in bookings), max))
+            
+            available = []
+            for start_time, end_time in candidates:
+                index = bisect_left(starts, end_time) - 1
+                available.append(index < 0 or latest_ends[index] <= start_time)
+            return available
+        except DatabaseError as e:
+            logger.error(f"Error checking staff availability: {e}")
+            return [False] * len(candidates)
+    
     @staticmethod
     def check_client_availability(
         client,
@@ -79,28 +189,69 @@ class AppointmentService:
             bool: True if client is available, False if there's a conflict
         """
         try:
-            # Build conflict query
-            conflict_query = Q(
-                client=client,
-                scheduled_start_time__lt=end_time,
-                scheduled_end_time__gt=start_time
+            conflict_query = _conflict_q(
+                'client', client, start_time, end_time, exclude_appointment_id
             )
             
-            # Exclude specific appointment if provided (for updates)
-            if exclude_appointment_id:
-                conflict_query &= ~Q(id=exclude_appointment_id)
-            
-            # Exclude cancelled appointments from conflict checking
-            conflict_query &= ~Q(status=Appointment.AppointmentStatus.CANCELLED)
-            
             # Check for conflicts
             conflicts = Appointment.objects.filter(conflict_query).exists()
             
             return not conflicts
-        except Exception as e:
+        except DatabaseError as e:
             logger.error(f"Error checking client availability: {e}")
             return False
     
+    @staticmethod
+    def check_availability(
+        staff_member,
+        client,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_appointment_id: Optional[int] = None
+    ) -> Tuple[bool, bool]:
+        """
+        Check staff and client availability for a time slot with one query.
+        
+        Args:
+            staff_member: StaffProfile instance
+            client: Client instance, or None to check the staff member only
+            start_time: Start time of the requested appointment
+            end_time: End time of the requested appointment
+            exclude_appointment_id: Appointment ID to exclude from conflict check (for updates)
+            
+        Returns:
+            Tuple[bool, bool]: (staff_available, client_available)
+        """
+        try:
+            # Count each side's conflicts in the same round trip
+            side_queries = {'staff_conflicts': Q(staff_member=staff_member)}
+            if client is not None:
+                side_queries['client_conflicts'] = Q(client=client)
+            
+            # Build conflict query for either side of the booking
+            conflict_query = Q(
+                scheduled_start_time__lt=end_time,
+                scheduled_end_time__gt=start_time
+            )
+            either_side = Q()
+            for side_query in side_queries.values():
+                either_side |= side_query
+            conflicts = Appointment.objects.filter(conflict_query, either_side).exclude(
+                status=_CANCELLED_STATUS
+            )
+            
+            # Exclude specific appointment if provided (for updates)
+            if exclude_appointment_id:
+                conflicts = conflicts.exclude(id=exclude_appointment_id)
+            
+            counts = conflicts.aggregate(**{
+                name: Count('id', filter=side_query) for name, side_query in side_queries.items()
+            })
+            return counts['staff_conflicts'] == 0, counts.get('client_conflicts', 0) == 0
+        except DatabaseError as e:
+            logger.error(f"Error checking availability: {e}")
+            return False, False
+    
     @staticmethod
     def get_available_time_slots(
         staff_member,
@@ -124,53 +275,198 @@ class AppointmentService:
         """
         try:
             # Get existing appointments for the day
-            day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = date.replace(hour=23, minute=59, second=59, microsecond=999999)
+            day_start, day_end = AppointmentService.local_day_range(timezone.localdate(date))
             
-            existing_appointments = Appointment.objects.filter(
+            booked_times = Appointment.objects.filter(
                 staff_member=staff_member,
                 scheduled_start_time__gte=day_start,
-                scheduled_start_time__lte=day_end,
-                status__in=[
-                    Appointment.AppointmentStatus.PENDING,
-                    Appointment.AppointmentStatus.CONFIRMED,
-                    Appointment.AppointmentStatus.CHECKED_IN,
-                    Appointment.AppointmentStatus.IN_PROGRESS
-                ]
-            ).order_by('scheduled_start_time')
-            
-            # Generate time slots
+                scheduled_start_time__lt=day_end,
+                status__in=_ACTIVE_STATUSES
+            ).values_list('scheduled_start_time', 'scheduled_end_time')
+            
+            # Mark booked minutes of the working window in one bitmap, so each
+            # candidate slot is a single mask test instead of a scan of the day
+            window_minutes = int((working_hours_end - working_hours_start).total_seconds() // 60)
+            busy = _busy_minutes_bitmap(booked_times, working_hours_start, window_minutes)
+            slot_mask = (1 << service_duration) - 1
+            
+            # Generate time slots (30-minute intervals)
             available_slots = []
-            current_time = working_hours_start
-            
-            while current_time + timedelta(minutes=service_duration) <= working_hours_end:
-                slot_end = current_time + timedelta(minutes=service_duration)
-                
-                # Check if slot conflicts with existing appointments
-                has_conflict = False
-                for appointment in existing_appointments:
-                    if (current_time < appointment.scheduled_end_time and 
-                        slot_end > appointment.scheduled_start_time):
-                        has_conflict = True
-                        break
-                
-                if not has_conflict:
-                    available_slots.append((current_time, slot_end))
-                
-                # Move to next slot (30-minute intervals)
-                current_time += timedelta(minutes=30)
+            for offset in range(0, window_minutes - service_duration + 1, 30):
+                if not busy & (slot_mask << offset):
+                    slot_start = working_hours_start + timedelta(minutes=offset)
+                    available_slots.append((slot_start, slot_start + timedelta(minutes=service_duration)))
             
             return available_slots
-        except Exception as e:
+        except DatabaseError as e:
             logger.error(f"Error getting available time slots: {e}")
             return []
     
+    @staticmethod
+    def local_day_range(target_date: date) -> Tuple[datetime, datetime]:
+        """
+        Get the half-open [start, end) range of a day in the salon's timezone.
+        
+        Both bounds are local midnights, so days of 23 or 25 hours around DST
+        changes are covered exactly.
+        
+        Args:
+            target_date: Day to get the range for
+            
+        Returns:
+            Tuple[datetime, datetime]: Aware start of the day and start of the next day
+        """
+        day_start = timezone.make_aware(datetime.combine(target_date, datetime.min.time()))
+        day_end = timezone.make_aware(datetime.combine(target_date + timedelta(days=1), datetime.min.time()))
+        return day_start, day_end
+    
+    @staticmethod
+    def get_availability(staff_member, service, target_date: date) -> dict:
+        """
+        Build the available-slots response for a staff member and service on a day.
+        
+        Args:
+            staff_member: StaffProfile instance with its user loaded
+            service: Service instance
+            target_date: Date to check availability for
+            
+        Returns:
+            dict: AvailableSlotsResponseSchema payload
+        """
+        availability = {
+            'date': target_date.isoformat(),
+            'staff_member_id': staff_member.id,
+            'staff_member_name': f"{staff_member.user.first_name} {staff_member.user.last_name}",
+            'service_id': service.id,
+            'service_name': service.name,
+            'service_duration': service.total_duration_minutes,
+            'available_slots': [],
+        }
+        
+        # Get working hours for the staff member on this day
+        day_of_week = target_date.isoweekday()  # 1=Monday, 7=Sunday
+        working_hours = WorkingHoursService.get_cached_week_schedule(staff_member.id)[day_of_week]
+        if working_hours is None:
+            # Staff is not available on this day
+            return availability
+        
+        # Create datetime objects for working hours in the salon's timezone
+        start_time, end_time = working_hours
+        working_start = timezone.make_aware(datetime.combine(target_date, start_time))
+        working_end = timezone.make_aware(datetime.combine(target_date, end_time))
+        
+        # Get available time slots (the day is derived from working_start)
+        available_slots = AppointmentService.get_available_time_slots(
+            staff_member,
+            working_start,
+            service.total_duration_minutes,
+            working_start,
+            working_end
+        )
+        
+        # Format time slots as strings
+        availability['available_slots'] = [
+            f"{slot_start.hour:02d}:{slot_start.minute:02d}" for slot_start, slot_end in available_slots
+        ]
+        return availability
+    
+    @staticmethod
+    def pack_availability(availability: dict) -> dict:
+        """
+        Replace the slot list of an availability response with a bitmask.
+        
+        Slots are 30 minutes apart, so each one is a single bit counted from
+        the earliest free slot.
+        
+        Args:
+            availability: AvailableSlotsResponseSchema payload with available_slots
+            
+        Returns:
+            dict: Payload with first_available_slot and available_slot_mask instead
+        """
+        packed = {key: value for key, value in availability.items() if key != 'available_slots'}
+        slot_minutes = [
+            int(slot[:2]) * 60 + int(slot[3:]) for slot in availability['available_slots']
+        ]
+        mask = 0
+        for minutes in slot_minutes:
+            mask |= 1 << ((minutes - slot_minutes[0]) // 30)
+        packed['first_available_slot'] = availability['available_slots'][0] if slot_minutes else None
+        packed['available_slot_mask'] = mask
+        return packed
+    
+    @staticmethod
+    def availability_cache_key(staff_member_id: int, service_id: int, target_date: str) -> str:
+        """
+        Get the cache key of an availability response.
+        
+        Args:
+            staff_member_id: ID of the staff member
+            service_id: ID of the service
+            target_date: Date in YYYY-MM-DD format
+            
+        Returns:
+            str: Cache key including the staff member's current day version
+        """
+        version_key = f"availability:version:{staff_member_id}:{target_date}"
+        version = cache.get(version_key, 0)
+        return f"availability:{staff_member_id}:{target_date}:{service_id}:{version}"
+    
+    @staticmethod
+    def invalidate_availability(staff_member_id: int, start_time: datetime) -> None:
+        """
+        Drop cached availability for the staff member's day containing start_time.
+        
+        Args:
+            staff_member_id: ID of the staff member
+            start_time: Any time within the affected day
+        """
+        target_date = timezone.localtime(start_time).date().isoformat()
+        version_key = f"availability:version:{staff_member_id}:{target_date}"
+        cache.set(version_key, time.time_ns(), AVAILABILITY_VERSION_TTL)
+    
+    @staticmethod
+    def count_cache_key(status: Optional[str]) -> str:
+        """
+        Get the cache key of the appointment list total for a status filter.
+        
+        Args:
+            status: Status filter, or None for all appointments
+            
+        Returns:
+            str: Cache key of the cached total
+        """
+        return f"appointments:count:{status or 'all'}"
+    
+    @staticmethod
+    def invalidate_counts() -> None:
+        """Drop cached list totals after appointments are created, changed or removed."""
+        statuses = [None, *Appointment.AppointmentStatus.values]
+        cache.delete_many([AppointmentService.count_cache_key(status) for status in statuses])
+    
+    @staticmethod
+    def raise_for_staff_overlap(error: IntegrityError) -> None:
+        """
+        Report the PostgreSQL no_staff_overlap exclusion constraint as a booking conflict.
+        
+        Args:
+            error: IntegrityError raised while writing appointments
+            
+        Raises:
+            ValidationError: If the error is a staff double booking
+            IntegrityError: The original error otherwise
+        """
+        if 'no_staff_overlap' in str(error):
+            raise ValidationError("Staff member is not available at the requested time") from error
+        raise error
+    
     @staticmethod
     def validate_appointment_time(
         staff_member,
         start_time: datetime,
         end_time: datetime,
-        exclude_appointment_id: Optional[int] = None
+        exclude_appointment_id: Optional[int] = None,
+        client=None
     ) -> Tuple[bool, str]:
         """
         Validate appointment time for conflicts and business rules.
@@ -180,6 +476,7 @@ class AppointmentService:
             start_time: Proposed start time
             end_time: Proposed end time
             exclude_appointment_id: Appointment ID to exclude from validation
+            client: Client instance to also check for double bookings (optional)
             
         Returns:
             Tuple[bool, str]: (is_valid, error_message)
@@ -192,10 +489,111 @@ class AppointmentService:
         if start_time >= end_time:
             return False, "Start time must be before end time"
         
-        # Check staff availability
-        if not AppointmentService.check_staff_availability(
-            staff_member, start_time, end_time, exclude_appointment_id
-        ):
+        # Check staff (and client) availability in one query
+        staff_available, client_available = AppointmentService.check_availability(
+            staff_member, client, start_time, end_time, exclude_appointment_id
+        )
+        if not staff_available:
             return False, "Staff member is not available at the requested time"
+        if not client_available:
+            return False, "Client already has an appointment at the requested time"
+        
+        return True, ""
+    
+    @staticmethod
+    def bulk_schedule(rows: List[dict]) -> List[Appointment]:
+        """
+        Create many appointments at once, e.g. when generating recurring bookings.
+        
+        Skips per-instance save(): rows are validated together, checked for
+        conflicts with one query, inserted with bulk_create, and confirmed by a
+        single background task after commit.
+        
+        Args:
+            rows: AppointmentCreateSchema payloads
+            
+        Returns:
+            List[Appointment]: Created appointments
+            
+        Raises:
+            ValidationError: If any row is invalid or conflicts with another booking
+        """
+        try:
+            # Every row is checked against the same "now"
+            appointments_data = _APPOINTMENT_CREATE_LIST_ADAPTER.validate_python(
+                rows, context={'now': timezone.now()}
+            )
+        except PydanticValidationError as e:
+            raise ValidationError(str(e))
+        if not appointments_data:
+            return []
+        
+        # Check related objects exist with one query per model
+        services = Service.objects.in_bulk({data.service_id for data in appointments_data})
+        client_ids = {data.client_id for data in appointments_data}
+        staff_ids = {data.staff_member_id for data in appointments_data}
+        if Client.objects.filter(id__in=client_ids).count() != len(client_ids):
+            raise ValidationError("One or more clients do not exist")
+        if StaffProfile.objects.filter(id__in=staff_ids).count() != len(staff_ids):
+            raise ValidationError("One or more staff members do not exist")
+        
+        # Existing bookings that could overlap any of the new ones
+        booked = defaultdict(list)
+        existing_appointments = Appointment.objects.filter(
+            staff_member_id__in=staff_ids,
+            status__in=_ACTIVE_STATUSES,
+            scheduled_start_time__lt=max(data.scheduled_end_time for data in appointments_data),
+            scheduled_end_time__gt=min(data.scheduled_start_time for data in appointments_data)
+        ).values_list('staff_member_id', 'scheduled_start_time', 'scheduled_end_time')
+        for staff_member_id, start_time, end_time in existing_appointments:
+            booked[staff_member_id].append((start_time, end_time))
+        
+        appointments = []
+        for data in appointments_data:
+            service = services.get(data.service_id)
+            if service is None:
+                raise ValidationError(f"Service {data.service_id} does not exist")
+            
+            time_diff = data.scheduled_end_time - data.scheduled_start_time
+            scheduled_duration = time_diff.total_seconds() / 60
+            if scheduled_duration != service.total_duration_minutes:
+                raise ValidationError(
+                    f"Appointment duration ({scheduled_duration} minutes) must match service duration ({service.total_duration_minutes} minutes)"
+                )
+            
+            # Conflicts with stored bookings and earlier rows of this batch
+            staff_bookings = booked[data.staff_member_id]
+            for start_time, end_time in staff_bookings:
+                if data.scheduled_start_time < end_time and data.scheduled_end_time > start_time:
+                    raise ValidationError(
+                        f"Staff member {data.staff_member_id} is not available at {data.scheduled_start_time.isoformat()}"
+                    )
+            staff_bookings.append((data.scheduled_start_time, data.scheduled_end_time))
+            
+            appointments.append(Appointment(
+                client_id=data.client_id,
+                service_id=data.service_id,
+                staff_member_id=data.staff_member_id,
+                scheduled_start_time=data.scheduled_start_time,
+                scheduled_end_time=data.scheduled_end_time,
+                duration_minutes=int(time_diff.total_seconds() // 60),
+                price=data.price,
+                notes=data.notes or '',
+            ))
+        
+        from .tasks import send_bulk_appointment_confirmations
+        
+        with transaction.atomic():
+            try:
+                created = Appointment.objects.bulk_create(appointments, batch_size=_BULK_CREATE_BATCH_SIZE)
+            except IntegrityError as e:
+                # A concurrent booking won the slot after the checks above
+                AppointmentService.raise_for_staff_overlap(e)
+            created_ids = [appointment.pk for appointment in created]
+            transaction.on_commit(lambda: send_bulk_appointment_confirmations.delay(created_ids))
+            transaction.on_commit(AppointmentService.invalidate_counts)
+        
+        for staff_member_id, start_time in {(a.staff_member_id, a.scheduled_start_time) for a in created}:
+            AppointmentService.invalidate_availability(staff_member_id, start_time)
         
-        return True, ""
\ No newline at end of file
+        return created
@@ -3,17 +3,99 @@ Task functions for appointment notifications.
 Provides functions for appointment-related notifications.
 """
 
+from celery import shared_task
+from django.core.cache import cache
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 import logging
 
-from .models import Appointment
+from .models import Appointment, format_datetime
+from .services import AppointmentService, AVAILABILITY_CACHE_TTL
 from apps.notifications.services import NotificationService
+from apps.services.models import Service
+from apps.staff.models import StaffProfile
 
 logger = logging.getLogger(__name__)
 
 
-def send_appointment_confirmation(appointment_id: int) -> None:
+# Notification tasks retry failed deliveries with exponential backoff
+NOTIFICATION_MAX_RETRIES = 3
+NOTIFICATION_RETRY_DELAY = 60  # seconds, doubled on every retry
+
+# Reminder fan-out: appointments handled by each send_appointment_reminders task
+REMINDER_BATCH_SIZE = 500
+
+
+# Columns the notification tasks read, including the client fields NotificationService uses
+_NOTIFICATION_FIELDS = (
+    'id',
+    'scheduled_start_time',
+    'price_cents',
+    'cancellation_reason',
+    'client__id',
+    'client__first_name',
+    'client__email',
+    'client__phone',
+)
+
+# Service and staff details built by the database instead of hydrating those rows
+_NOTIFICATION_ANNOTATIONS = {
+    'service_name': F('service__name'),
+    'service_duration': F('service__duration_minutes'),
+    'staff_name': Concat(
+        'staff_member__user__first_name', Value(' '), 'staff_member__user__last_name',
+        output_field=CharField()
+    ),
+}
+
+
+def _notification_queryset():
+    """Appointments with their client and the service/staff details notifications read."""
+    return (
+        Appointment.objects.select_related('client')
+        .only(*_NOTIFICATION_FIELDS)
+        .annotate(**_NOTIFICATION_ANNOTATIONS)
+    )
+
+
+def _retry_or_log(task, exc: Exception, message: str) -> None:
+    """
+    Retry a failed notification task, or log the failure once retries run out.
+    
+    Direct and eager calls log straight away so callers never see the error.
+    """
+    request = task.request
+    if request.called_directly or request.is_eager or request.retries >= task.max_retries:
+        logger.error(f"{message}: {exc}")
+        return
+    raise task.retry(exc=exc, countdown=NOTIFICATION_RETRY_DELAY * 2 ** request.retries)
+
+
+def _appointment_details(appointment) -> dict:
+    """Prepare the appointment details shared by every notification."""
+    return {
+        'service_name': appointment.service_name,
+        'datetime': format_datetime(timezone.localtime(appointment.scheduled_start_time)),
+        'staff_name': appointment.staff_name,
+    }
+
+
+def _notify_confirmation(appointment) -> None:
+    """Send a confirmation for an appointment loaded by _notification_queryset()."""
+    appointment_details = _appointment_details(appointment)
+    appointment_details['duration'] = appointment.service_duration
+    appointment_details['price'] = appointment.price_cents / 100
+    
+    NotificationService.send_appointment_confirmation(
+        client=appointment.client,
+        appointment_details=appointment_details
+    )
+
+
+@shared_task(bind=True, max_retries=NOTIFICATION_MAX_RETRIES)
+def send_appointment_confirmation(self, appointment_id: int) -> None:
     """
     Send appointment confirmation notification.
     
@@ -21,31 +103,33 @@ def send_appointment_confirmation(appointment_id: int) -> None:
         appointment_id: ID of the appointment to send confirmation for
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
-        
-        # Prepare appointment details for notification
-        appointment_details = {
-            'service_name': appointment.service.name,
-            'datetime': appointment.scheduled_start_time.strftime('%Y-%m-%d %H:%M'),
-            'staff_name': f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            'duration': appointment.service.duration_minutes,
-            'price': float(appointment.price),
-        }
+        appointment = _notification_queryset().get(id=appointment_id)
         
         # Send confirmation notification
-        NotificationService.send_appointment_confirmation(
-            client=appointment.client,
-            appointment_details=appointment_details
-        )
+        _notify_confirmation(appointment)
         
         logger.info(f"Appointment confirmation sent for appointment {appointment_id}")
     except Appointment.DoesNotExist:
         logger.error(f"Appointment {appointment_id} not found for confirmation")
     except Exception as e:
-        logger.error(f"Failed to send appointment confirmation for appointment {appointment_id}: {e}")
+        _retry_or_log(self, e, f"Failed to send appointment confirmation for appointment {appointment_id}")
+
+
+def _send_reminder(appointment) -> None:
+    """Send a reminder for an appointment loaded by _notification_queryset()."""
+    appointment_details = _appointment_details(appointment)
+    start_time = timezone.localtime(appointment.scheduled_start_time)
+    appointment_details['time'] = f"{start_time.hour:02d}:{start_time.minute:02d}"
+    appointment_details['duration'] = appointment.service_duration
+    
+    NotificationService.send_appointment_reminder(
+        client=appointment.client,
+        appointment_details=appointment_details
+    )
 
 
-def send_appointment_reminder(appointment_id: int) -> None:
+@shared_task(bind=True, max_retries=NOTIFICATION_MAX_RETRIES)
+def send_appointment_reminder(self, appointment_id: int) -> None:
     """
     Send appointment reminder notification.
     
@@ -53,31 +137,20 @@ def send_appointment_reminder(appointment_id: int) -> None:
         appointment_id: ID of the appointment to send reminder for
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
-        
-        # Prepare appointment details for notification
-        appointment_details = {
-            'service_name': appointment.service.name,
-            'datetime': appointment.scheduled_start_time.strftime('%Y-%m-%d %H:%M'),
-            'time': appointment.scheduled_start_time.strftime('%H:%M'),
-            'staff_name': f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            'duration': appointment.service.duration_minutes,
-        }
+        appointment = _notification_queryset().get(id=appointment_id)
         
         # Send reminder notification
-        NotificationService.send_appointment_reminder(
-            client=appointment.client,
-            appointment_details=appointment_details
-        )
+        _send_reminder(appointment)
         
         logger.info(f"Appointment reminder sent for appointment {appointment_id}")
     except Appointment.DoesNotExist:
         logger.error(f"Appointment {appointment_id} not found for reminder")
     except Exception as e:
-        logger.error(f"Failed to send appointment reminder for appointment {appointment_id}: {e}")
+        _retry_or_log(self, e, f"Failed to send appointment reminder for appointment {appointment_id}")
 
 
-def send_appointment_cancellation(appointment_id: int) -> None:
+@shared_task(bind=True, max_retries=NOTIFICATION_MAX_RETRIES)
+def send_appointment_cancellation(self, appointment_id: int) -> None:
     """
     Send appointment cancellation notification.
     
@@ -85,15 +158,11 @@ def send_appointment_cancellation(appointment_id: int) -> None:
         appointment_id: ID of the appointment to send cancellation for
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
+        appointment = _notification_queryset().get(id=appointment_id)
         
         # Prepare appointment details for notification
-        appointment_details = {
-            'service_name': appointment.service.name,
-            'datetime': appointment.scheduled_start_time.strftime('%Y-%m-%d %H:%M'),
-            'staff_name': f"{appointment.staff_member.user.first_name} {appointment.staff_member.user.last_name}",
-            'cancellation_reason': appointment.cancellation_reason or "No reason provided",
-        }
+        appointment_details = _appointment_details(appointment)
+        appointment_details['cancellation_reason'] = appointment.cancellation_reason or "No reason provided"
         
         # Send cancellation notification
         NotificationService.send_appointment_cancellation(
@@ -105,32 +174,105 @@ def send_appointment_cancellation(appointment_id: int) -> None:
     except Appointment.DoesNotExist:
         logger.error(f"Appointment {appointment_id} not found for cancellation")
     except Exception as e:
-        logger.error(f"Failed to send appointment cancellation for appointment {appointment_id}: {e}")
+        _retry_or_log(self, e, f"Failed to send appointment cancellation for appointment {appointment_id}")
 
 
+@shared_task
 def schedule_appointment_reminders() -> None:
     """
     Schedule appointment reminders for upcoming appointments.
-    This function should be run periodically (e.g., daily) to schedule reminders.
+    This task should be run periodically (e.g., daily) to schedule reminders.
+    Reminders are sent by send_appointment_reminders tasks, one per batch.
     """
     try:
-        # Find appointments that are confirmed and scheduled for tomorrow
-        tomorrow = timezone.now() + timedelta(days=1)
-        tomorrow_start = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-        tomorrow_end = tomorrow.replace(hour=23, minute=59, second=59, microsecond=999999)
+        # Find appointments that are confirmed and scheduled for tomorrow (salon time)
+        tomorrow_start, tomorrow_end = AppointmentService.local_day_range(
+            timezone.localdate() + timedelta(days=1)
+        )
         
-        appointments = Appointment.objects.filter(
+        appointment_ids = Appointment.objects.filter(
             status=Appointment.AppointmentStatus.CONFIRMED,
             scheduled_start_time__gte=tomorrow_start,
-            scheduled_start_time__lte=tomorrow_end
-        )
+            scheduled_start_time__lt=tomorrow_end
+        ).values_list('id', flat=True)
         
-        reminder_count = 0
-        for appointment in appointments:
-            # Call reminder function directly (instead of scheduling Celery task)
-            send_appointment_reminder(appointment.id)
+        # Stream IDs only and enqueue them in batches; workers load the rows
+        batch_count = 0
+        batch = []
+        for appointment_id in appointment_ids.iterator(chunk_size=REMINDER_BATCH_SIZE):
+            batch.append(appointment_id)
+            if len(batch) == REMINDER_BATCH_SIZE:
+                send_appointment_reminders.delay(batch)
+                batch_count += 1
+                batch = []
+        if batch:
+            send_appointment_reminders.delay(batch)
+            batch_count += 1
+        
+        logger.info(f"Scheduled {batch_count} appointment reminder batches")
+    except Exception as e:
+        logger.error(f"Failed to schedule appointment reminders: {e}")
+
+
+@shared_task
+def send_appointment_reminders(appointment_ids: list) -> None:
+    """
+    Send reminders for a batch of appointments queued by schedule_appointment_reminders().
+    
+    Args:
+        appointment_ids: IDs of the appointments to remind
+    """
+    reminder_count = 0
+    for appointment in _notification_queryset().filter(id__in=appointment_ids):
+        # Send from the already-loaded rows instead of re-fetching each one
+        try:
+            _send_reminder(appointment)
             reminder_count += 1
+        except Exception as e:
+            logger.error(f"Failed to send appointment reminder for appointment {appointment.id}: {e}")
+    
+    logger.info(f"Sent {reminder_count} appointment reminders")
+
+
+@shared_task
+def warm_availability(staff_member_id: int, service_id: int, date_iso: str) -> None:
+    """
+    Recompute and cache availability after an appointment change.
+    
+    Args:
+        staff_member_id: ID of the staff member whose day changed
+        service_id: ID of the service to warm availability for
+        date_iso: Affected date in YYYY-MM-DD format
+    """
+    try:
+        staff_member = StaffProfile.objects.select_related('user').get(id=staff_member_id)
+        service = Service.objects.get(id=service_id)
         
-        logger.info(f"Sent {reminder_count} appointment reminders")
+        availability = AppointmentService.get_availability(
+            staff_member, service, date.fromisoformat(date_iso)
+        )
+        cache_key = AppointmentService.availability_cache_key(staff_member_id, service_id, date_iso)
+        cache.set(cache_key, availability, AVAILABILITY_CACHE_TTL)
+    except (StaffProfile.DoesNotExist, Service.DoesNotExist):  # type: ignore
+        logger.warning(f"Skipping availability warm-up for staff {staff_member_id}, service {service_id}")
     except Exception as e:
-        logger.error(f"Failed to send appointment reminders: {e}")
\ No newline at end of file
+        logger.error(f"Failed to warm availability for staff {staff_member_id} on {date_iso}: {e}")
+
+
+@shared_task
+def send_bulk_appointment_confirmations(appointment_ids: list) -> None:
+    """
+    Send confirmations for appointments created together by bulk_schedule().
+    
+    Args:
+        appointment_ids: IDs of the newly created appointments
+    """
+    sent_count = 0
+    for appointment in _notification_queryset().filter(id__in=appointment_ids):
+        try:
+            _notify_confirmation(appointment)
+            sent_count += 1
+        except Exception as e:
+            logger.error(f"Failed to send appointment confirmation for appointment {appointment.id}: {e}")
+    
+    logger.info(f"Sent {sent_count} appointment confirmations for bulk scheduling")
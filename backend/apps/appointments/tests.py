@@ -4,27 +4,40 @@ Tests Appointment model functionality, constraints, and status tracking.
 """
 
 import pytest
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlencode
+from ninja.testing import TestClient
+from celery.exceptions import Retry
 
 from apps.clients.models import Client
 from apps.services.models import Service, ServiceCategory
-from apps.staff.models import StaffProfile, Specialization
+from apps.staff.models import StaffProfile, Specialization, WorkingHours
 from apps.authentication.models import SalonUser
+from .api import router, _serialize_appointment
 from .models import Appointment
 from .services import AppointmentService
-from .tasks import send_appointment_confirmation, send_appointment_reminder, send_appointment_cancellation
+from .tasks import (
+    send_appointment_confirmation, send_appointment_reminder, send_appointment_cancellation,
+    schedule_appointment_reminders, _retry_or_log
+)
 
 
 class AppointmentNotificationTest(TestCase):
     """Test cases for appointment notification integration."""
     
-    def setUp(self):
-        """Set up test data."""
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
         # Create client
-        self.client_obj = Client.objects.create(
+        cls.client_obj = Client.objects.create(
             first_name="John",
             last_name="Doe",
             email="john.doe@example.com",
@@ -32,7 +45,7 @@ class AppointmentNotificationTest(TestCase):
         )
         
         # Create staff user
-        self.staff_user = SalonUser.objects.create_user(
+        cls.staff_user = SalonUser.objects.create_user(
             username="jane_smith",
             email="staff@example.com",
             password="testpass123",
@@ -41,7 +54,7 @@ class AppointmentNotificationTest(TestCase):
         )
         
         # Create specialization
-        self.specialization = Specialization.objects.create(
+        cls.specialization = Specialization.objects.create(
             name="Hair Styling",
             specialization_type=Specialization.SpecializationType.BEAUTY_TREATMENT,
             description="Hair styling services",
@@ -49,8 +62,8 @@ class AppointmentNotificationTest(TestCase):
         )
         
         # Create staff profile
-        self.staff_member = StaffProfile.objects.create(
-            user=self.staff_user,
+        cls.staff_member = StaffProfile.objects.create(
+            user=cls.staff_user,
             certification_level=StaffProfile.CertificationLevel.SENIOR,
             years_of_experience=5,
             hourly_rate=50.00,
@@ -62,11 +75,15 @@ class AppointmentNotificationTest(TestCase):
             emergency_contact_phone="+1234567891"
         )
         
-        # Add specialization to staff member
-        self.staff_member.specializations.add(self.specialization)
+        # Add specialization to staff member (one INSERT, without add()'s existing-link lookup)
+        StaffProfile.specializations.through.objects.bulk_create([
+            StaffProfile.specializations.through(
+                staffprofile=cls.staff_member, specialization=cls.specialization
+            )
+        ])
         
         # Create service category
-        self.category = ServiceCategory.objects.create(
+        cls.category = ServiceCategory.objects.create(
             name="Hair Services",
             description="Hair care services",
             is_active=True,
@@ -74,7 +91,7 @@ class AppointmentNotificationTest(TestCase):
         )
         
         # Create service
-        self.service = Service.objects.create(
+        cls.service = Service.objects.create(
             name="Haircut",
             description="Basic haircut service",
             base_price=30.00,
@@ -84,88 +101,686 @@ class AppointmentNotificationTest(TestCase):
             preparation_time=5,
             cleanup_time=5,
             display_order=1,
-            category=self.category
+            category=cls.category
         )
         
         # Create appointment without triggering notifications by mocking the service
         with patch('apps.notifications.services.NotificationService'):
-            self.appointment_time = timezone.now() + timedelta(days=1)
-            self.appointment = Appointment.objects.create(
-                client=self.client_obj,
-                service=self.service,
-                staff_member=self.staff_member,
-                scheduled_start_time=self.appointment_time,
-                scheduled_end_time=self.appointment_time + timedelta(minutes=40),  # 30 min service + 5 min prep + 5 min cleanup
+            cls.appointment_time = timezone.now() + timedelta(days=1)
+            cls.appointment = Appointment.objects.create(
+                client=cls.client_obj,
+                service=cls.service,
+                staff_member=cls.staff_member,
+                scheduled_start_time=cls.appointment_time,
+                scheduled_end_time=cls.appointment_time + timedelta(minutes=40),  # 30 min service + 5 min prep + 5 min cleanup
                 price=30.00
             )
     
-    @patch('apps.notifications.services.NotificationService.send_appointment_confirmation')
-    def test_appointment_creation_triggers_confirmation(self, mock_send_confirmation):
+    def setUp(self):
+        """Replace the notification service the tasks deliver through."""
+        patcher = patch('apps.appointments.tasks.NotificationService')
+        self.notifications = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_appointment_creation_triggers_confirmation(self):
         """Test that creating a new appointment triggers a confirmation notification."""
         # Create a new appointment
         appointment_time = timezone.now() + timedelta(days=2)
-        # Don't mock the NotificationService here so the notification is actually sent
-        new_appointment = Appointment.objects.create(
-            client=self.client_obj,
-            service=self.service,
-            staff_member=self.staff_member,
-            scheduled_start_time=appointment_time,
-            scheduled_end_time=appointment_time + timedelta(minutes=40),  # 30 min service + 5 min prep + 5 min cleanup
-            price=30.00
-        )
+        # Notifications are dispatched once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            new_appointment = Appointment.objects.create(
+                client=self.client_obj,
+                service=self.service,
+                staff_member=self.staff_member,
+                scheduled_start_time=appointment_time,
+                scheduled_end_time=appointment_time + timedelta(minutes=40),  # 30 min service + 5 min prep + 5 min cleanup
+                price=30.00
+            )
         
         # Verify that the confirmation notification was triggered
-        mock_send_confirmation.assert_called_once()
+        self.notifications.send_appointment_confirmation.assert_called_once()
     
-    @patch('apps.notifications.services.NotificationService.send_appointment_confirmation')
-    def test_appointment_confirmation_triggers_notification(self, mock_send_confirmation):
+    def test_appointment_confirmation_triggers_notification(self):
         """Test that confirming an appointment triggers a confirmation notification."""
         # Change appointment status from pending to confirmed
         self.appointment.status = Appointment.AppointmentStatus.CONFIRMED
-        self.appointment.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.appointment.save()
         
         # Verify that the confirmation notification was triggered
-        mock_send_confirmation.assert_called_once()
+        self.notifications.send_appointment_confirmation.assert_called_once()
     
-    @patch('apps.notifications.services.NotificationService.send_appointment_cancellation')
-    def test_appointment_cancellation_triggers_notification(self, mock_send_cancellation):
+    def test_appointment_cancellation_triggers_notification(self):
         """Test that cancelling an appointment triggers a cancellation notification."""
         # Change appointment status to cancelled
         self.appointment.status = Appointment.AppointmentStatus.CANCELLED
         self.appointment.cancellation_reason = "Client request"
-        self.appointment.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.appointment.save()
         
         # Verify that the cancellation notification was triggered
-        mock_send_cancellation.assert_called_once()
+        self.notifications.send_appointment_cancellation.assert_called_once()
     
-    @patch('apps.notifications.services.NotificationService.send_appointment_reminder')
-    def test_send_appointment_reminder_task(self, mock_send_reminder):
+    def test_send_appointment_reminder_task(self):
         """Test the send_appointment_reminder task."""
-        # Call the task directly
-        send_appointment_reminder(self.appointment.id)
+        # Call the task directly; only the slimmed joined row is fetched
+        with self.assertNumQueries(1):
+            send_appointment_reminder(self.appointment.id)
         
         # Verify that the reminder notification was sent
-        mock_send_reminder.assert_called_once()
+        self.notifications.send_appointment_reminder.assert_called_once()
     
-    @patch('apps.notifications.services.NotificationService.send_appointment_cancellation')
-    def test_send_appointment_cancellation_task(self, mock_send_cancellation):
+    def test_schedule_appointment_reminders_batches_queries(self):
+        """Test that reminders are enqueued by ID and sent from one joined query per batch."""
+        Appointment.objects.filter(id=self.appointment.id).update(
+            status=Appointment.AppointmentStatus.CONFIRMED
+        )
+        
+        with self.assertNumQueries(2):  # reminder IDs + one joined fetch for the batch
+            schedule_appointment_reminders()
+        
+        send_reminder = self.notifications.send_appointment_reminder
+        send_reminder.assert_called_once()
+        self.assertEqual(send_reminder.call_args.kwargs['client'], self.client_obj)
+        
+        # Times are given in the salon's timezone, not the stored UTC value
+        local_start = timezone.localtime(self.appointment.scheduled_start_time)
+        appointment_details = send_reminder.call_args.kwargs['appointment_details']
+        self.assertEqual(appointment_details['time'], local_start.strftime('%H:%M'))
+        self.assertEqual(appointment_details['datetime'], local_start.strftime('%Y-%m-%d %H:%M'))
+    
+    def test_notification_retry_backs_off_until_retries_run_out(self):
+        """Test that failed worker deliveries are retried with backoff, then logged."""
+        task = MagicMock(max_retries=3)
+        task.request.called_directly = False
+        task.request.is_eager = False
+        task.request.retries = 1
+        task.retry.side_effect = Retry()
+        error = ConnectionError("SMTP unavailable")
+        
+        with self.assertRaises(Retry):
+            _retry_or_log(task, error, "Failed to send")
+        task.retry.assert_called_once_with(exc=error, countdown=120)
+        
+        task.retry.reset_mock()
+        task.request.retries = 3
+        _retry_or_log(task, error, "Failed to send")
+        task.retry.assert_not_called()
+    
+    def test_send_appointment_confirmation_task(self):
+        """Test the send_appointment_confirmation task."""
+        # Call the task directly; only the slimmed joined row is fetched
+        with self.assertNumQueries(1):
+            send_appointment_confirmation(self.appointment.id)
+        
+        send_confirmation = self.notifications.send_appointment_confirmation
+        send_confirmation.assert_called_once()
+        self.assertEqual(send_confirmation.call_args.kwargs['client'], self.client_obj)
+        appointment_details = send_confirmation.call_args.kwargs['appointment_details']
+        self.assertEqual(appointment_details['service_name'], 'Haircut')
+        self.assertEqual(appointment_details['staff_name'], 'Jane Smith')
+        self.assertEqual(appointment_details['duration'], 30)
+    
+    def test_send_appointment_cancellation_task(self):
         """Test the send_appointment_cancellation task."""
         # Create a new appointment specifically for this test to avoid conflicts
+        appointment_time = timezone.now() + timedelta(days=3)
+        test_appointment = Appointment.objects.create(
+            client=self.client_obj,
+            service=self.service,
+            staff_member=self.staff_member,
+            scheduled_start_time=appointment_time,
+            scheduled_end_time=appointment_time + timedelta(minutes=40),
+            price=30.00,
+            status=Appointment.AppointmentStatus.CANCELLED,
+            cancellation_reason="Staff unavailable"
+        )
+        
+        # Call the task directly (without saving the appointment again);
+        # the client, service and staff details come from one joined row
+        with self.assertNumQueries(1):
+            send_appointment_cancellation(test_appointment.id)
+        
+        # Verify that the cancellation notification was sent
+        self.notifications.send_appointment_cancellation.assert_called_once()
+
+class AppointmentAPITest(TestCase):
+    """Test cases for appointment API endpoints."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
+        cls.client_obj = Client.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone="+1234567890"
+        )
+        
+        cls.staff_user = SalonUser.objects.create_user(
+            username="jane_smith",
+            email="staff@example.com",
+            password="testpass123",
+            first_name="Jane",
+            last_name="Smith"
+        )
+        
+        cls.staff_member = StaffProfile.objects.create(
+            user=cls.staff_user,
+            certification_level=StaffProfile.CertificationLevel.SENIOR,
+            years_of_experience=5
+        )
+        
+        cls.category = ServiceCategory.objects.create(
+            name="Hair Services",
+            description="Hair care services"
+        )
+        
+        cls.service = Service.objects.create(
+            name="Haircut",
+            description="Basic haircut service",
+            base_price=30.00,
+            duration_minutes=30,
+            preparation_time=5,
+            cleanup_time=5,
+            category=cls.category
+        )
+        
+        # Create appointments without triggering notifications
         with patch('apps.notifications.services.NotificationService'):
-            appointment_time = timezone.now() + timedelta(days=3)
-            test_appointment = Appointment.objects.create(
-                client=self.client_obj,
-                service=self.service,
-                staff_member=self.staff_member,
-                scheduled_start_time=appointment_time,
-                scheduled_end_time=appointment_time + timedelta(minutes=40),
-                price=30.00,
-                status=Appointment.AppointmentStatus.CANCELLED,
-                cancellation_reason="Staff unavailable"
+            cls.appointments = []
+            for day in range(1, 4):
+                start_time = timezone.now() + timedelta(days=day)
+                cls.appointments.append(Appointment.objects.create(
+                    client=cls.client_obj,
+                    service=cls.service,
+                    staff_member=cls.staff_member,
+                    scheduled_start_time=start_time,
+                    scheduled_end_time=start_time + timedelta(minutes=40),
+                    price=30.00
+                ))
+    
+    def setUp(self):
+        """Set up the API test client."""
+        self.client = TestClient(router)
+    
+    def test_get_appointment_single_query(self):
+        """Test that fetching an appointment joins its relations in one query."""
+        appointment = self.appointments[0]
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/{appointment.id}')
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = response.json()
+        self.assertEqual(response_data['client_name'], 'John Doe')
+        self.assertEqual(response_data['service_name'], 'Haircut')
+        self.assertEqual(response_data['staff_name'], 'Jane Smith')
+        self.assertEqual(response_data['price'], '30.00')
+        self.assertEqual(response_data['duration_minutes'], 40)
+    
+    def test_get_appointment_datetime_format(self):
+        """Test that timestamps keep Ninja's "Z"-suffixed, millisecond-precision format."""
+        appointment = self.appointments[0]
+        start_time = datetime(2030, 1, 15, 10, 30, 0, 123456, tzinfo=dt_timezone.utc)
+        Appointment.objects.filter(id=appointment.id).update(
+            scheduled_start_time=start_time,
+            scheduled_end_time=start_time + timedelta(minutes=40)
+        )
+        
+        response = self.client.get(f'/{appointment.id}')
+        
+        self.assertEqual(response.json()['scheduled_start_time'], '2030-01-15T10:30:00.123Z')
+        self.assertEqual(response.json()['scheduled_end_time'], '2030-01-15T11:10:00.123Z')
+    
+    def test_serialize_appointment_keeps_empty_passed_names(self):
+        """Test that empty names passed in are used instead of missing annotations."""
+        appointment = Appointment.objects.get(id=self.appointments[0].id)
+        
+        data = _serialize_appointment(appointment, client_name='', service_name='', staff_name='')
+        
+        self.assertEqual(
+            (data['client_name'], data['service_name'], data['staff_name']), ('', '', '')
+        )
+    
+    def test_list_appointments_query_count(self):
+        """Test that listing appointments does not issue per-row queries."""
+        with self.assertNumQueries(2):  # count + page select
+            response = self.client.get('/')
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = response.json()
+        self.assertEqual(response_data['total'], 3)
+        self.assertEqual(len(response_data['appointments']), 3)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_list_appointments_caches_total(self):
+        """Test that the list total is cached until an appointment changes."""
+        cache.clear()
+        self.client.get('/?status=pending')
+        
+        with self.assertNumQueries(1):  # page select only
+            response = self.client.get('/?status=pending')
+        self.assertEqual(response.json()['total'], 3)
+        
+        with patch('apps.notifications.services.NotificationService'):
+            self.client.post(f'/{self.appointments[0].id}/cancel')
+        
+        with self.assertNumQueries(2):  # count recomputed after the change
+            response = self.client.get('/?status=pending')
+        self.assertEqual(response.json()['total'], 2)
+    
+    def test_list_appointments_keyset_pagination(self):
+        """Test that the next cursor continues where the previous page ended."""
+        response = self.client.get('/?page_size=2')
+        first_page = response.json()
+        self.assertTrue(first_page['has_more'])
+        self.assertEqual(len(first_page['appointments']), 2)
+        
+        query = urlencode({
+            'page_size': 2,
+            'before': first_page['next_before'],
+            'before_id': first_page['next_before_id'],
+        })
+        response = self.client.get(f'/?{query}')
+        second_page = response.json()
+        self.assertFalse(second_page['has_more'])
+        self.assertIsNone(second_page['next_before'])
+        self.assertEqual(
+            [appointment['id'] for appointment in second_page['appointments']],
+            [self.appointments[0].id]
+        )
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_check_availability_cached_until_day_changes(self):
+        """Test that availability is served from cache until the staff member's day changes."""
+        cache.clear()
+        appointment = self.appointments[0]
+        date = timezone.localtime(appointment.scheduled_start_time).date()
+        working_hours = WorkingHours.objects.create(
+            staff_profile=self.staff_member,
+            day_of_week=date.isoweekday(),
+            start_time=datetime.strptime('00:00', '%H:%M').time(),
+            end_time=datetime.strptime('23:59', '%H:%M').time()
+        )
+        payload = {
+            'staff_member_id': self.staff_member.id,
+            'service_id': self.service.id,
+            'date': date.isoformat(),
+        }
+        
+        first_response = self.client.get('/availability/', json=payload)
+        self.assertEqual(first_response.status_code, 200)
+        self.assertTrue(first_response.json()['available_slots'])
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/availability/', json=payload)
+        self.assertEqual(response.json(), first_response.json())
+        
+        with patch('apps.notifications.services.NotificationService'):
+            self.client.post(f'/{appointment.id}/cancel')
+        
+        with self.assertNumQueries(3):  # staff, service, appointments; week schedule cached
+            self.client.get('/availability/', json=payload)
+        
+        working_hours.save()
+        self.assertIsNone(cache.get(WorkingHours.week_schedule_cache_key(self.staff_member.id)))
+    
+    def test_check_availability_packed(self):
+        """Test that packed availability encodes the same slots as the list response."""
+        date = timezone.localtime(self.appointments[0].scheduled_start_time).date()
+        WorkingHours.objects.create(
+            staff_profile=self.staff_member,
+            day_of_week=date.isoweekday(),
+            start_time=datetime.strptime('09:00', '%H:%M').time(),
+            end_time=datetime.strptime('17:00', '%H:%M').time()
+        )
+        payload = {
+            'staff_member_id': self.staff_member.id,
+            'service_id': self.service.id,
+            'date': date.isoformat(),
+        }
+        
+        slots = self.client.get('/availability/', json=payload).json()['available_slots']
+        packed = self.client.get('/availability/', json={**payload, 'packed': True}).json()
+        
+        self.assertNotIn('available_slots', packed)
+        self.assertEqual(packed['first_available_slot'], slots[0])
+        first = datetime.strptime(slots[0], '%H:%M')
+        decoded = [
+            (first + timedelta(minutes=30 * bit)).strftime('%H:%M')
+            for bit in range(packed['available_slot_mask'].bit_length())
+            if packed['available_slot_mask'] >> bit & 1
+        ]
+        self.assertEqual(decoded, slots)
+    
+    def test_create_appointment_query_count(self):
+        """Test that creating an appointment does not re-fetch related objects."""
+        start_time = timezone.now() + timedelta(days=10)
+        payload = {
+            'client_id': self.client_obj.id,
+            'service_id': self.service.id,
+            'staff_member_id': self.staff_member.id,
+            'scheduled_start_time': start_time.isoformat(),
+            'scheduled_end_time': (start_time + timedelta(minutes=40)).isoformat(),
+            'price': '30.00',
+        }
+        
+        with patch('apps.notifications.services.NotificationService'):
+            # client, service, locked staff + user, staff conflict check, insert,
+            # plus the savepoint pair of the atomic block inside the test transaction
+            with self.assertNumQueries(7):
+                response = self.client.post('/', json=payload)
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = response.json()
+        self.assertEqual(response_data['client_name'], 'John Doe')
+        self.assertEqual(response_data['staff_name'], 'Jane Smith')
+        self.assertEqual(response_data['service_name'], 'Haircut')
+    
+    def test_create_appointment_missing_client(self):
+        """Test that an unknown client id returns 404."""
+        start_time = timezone.now() + timedelta(days=10)
+        payload = {
+            'client_id': 9999,
+            'service_id': self.service.id,
+            'staff_member_id': self.staff_member.id,
+            'scheduled_start_time': start_time.isoformat(),
+            'scheduled_end_time': (start_time + timedelta(minutes=40)).isoformat(),
+            'price': '30.00',
+        }
+        
+        response = self.client.post('/', json=payload)
+        self.assertEqual(response.status_code, 404)
+    
+    @patch('apps.notifications.services.NotificationService.send_appointment_confirmation')
+    def test_confirm_appointment_single_update(self, mock_send_confirmation):
+        """Test that confirming issues one conditional UPDATE and still notifies."""
+        appointment = self.appointments[0]
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(2):  # conditional update + joined fetch
+                response = self.client.post(f'/{appointment.id}/confirm')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], Appointment.AppointmentStatus.CONFIRMED)
+        mock_send_confirmation.assert_called_once()
+    
+    def test_confirm_appointment_rejects_stale_status(self):
+        """Test that a second confirm fails instead of re-applying the transition."""
+        appointment = self.appointments[0]
+        with patch('apps.notifications.services.NotificationService'):
+            self.client.post(f'/{appointment.id}/confirm')
+        
+        with self.assertRaises(ValidationError):
+            self.client.post(f'/{appointment.id}/confirm')
+        
+        response = self.client.post('/9999/confirm')
+        self.assertEqual(response.status_code, 404)
+    
+    @patch('apps.notifications.services.NotificationService.send_appointment_cancellation')
+    def test_cancel_appointment_records_reason(self, mock_send_cancellation):
+        """Test that cancelling stores the reason and sends the cancellation notice."""
+        appointment = self.appointments[0]
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/{appointment.id}/cancel?reason=Sick')
+        
+        self.assertEqual(response.json()['status'], Appointment.AppointmentStatus.CANCELLED)
+        self.assertEqual(response.json()['cancellation_reason'], 'Sick')
+        mock_send_cancellation.assert_called_once()
+    
+    @patch('apps.notifications.services.NotificationService.send_appointment_cancellation')
+    def test_cancel_appointment_rejects_already_cancelled(self, mock_send_cancellation):
+        """Test that re-cancelling fails without sending a second cancellation notice."""
+        appointment = self.appointments[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/{appointment.id}/cancel')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValidationError):
+                self.client.post(f'/{appointment.id}/cancel')
+        mock_send_cancellation.assert_called_once()
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cancel_appointment_warms_availability(self):
+        """Test that availability is recomputed in the background after a cancellation."""
+        cache.clear()
+        appointment = self.appointments[0]
+        date = timezone.localtime(appointment.scheduled_start_time).date()
+        payload = {
+            'staff_member_id': self.staff_member.id,
+            'service_id': self.service.id,
+            'date': date.isoformat(),
+        }
+        
+        with patch('apps.notifications.services.NotificationService'):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.client.post(f'/{appointment.id}/cancel')
+        self.assertEqual(len(callbacks), 2)  # availability warm-up + cancellation notice
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/availability/', json=payload)
+        self.assertEqual(response.json()['date'], date.isoformat())
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_availability_cache_key_uses_normalized_date(self):
+        """Test that other ISO date spellings share the cache entry invalidation drops."""
+        cache.clear()
+        date = timezone.localtime(self.appointments[0].scheduled_start_time).date()
+        payload = {'staff_member_id': self.staff_member.id, 'service_id': self.service.id}
+        
+        self.client.get('/availability/', json={**payload, 'date': date.strftime('%Y%m%d')})
+        with self.assertNumQueries(0):
+            response = self.client.get('/availability/', json={**payload, 'date': date.isoformat()})
+        self.assertEqual(response.json()['date'], date.isoformat())
+    
+    def test_list_appointments_skips_notes_by_default(self):
+        """Test that list rows leave out free-text columns unless requested."""
+        Appointment.objects.filter(id=self.appointments[0].id).update(notes='Prefers short fringe')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        self.assertNotIn('"notes"', queries.captured_queries[-1]['sql'])
+        self.assertEqual(
+            {appointment['notes'] for appointment in response.json()['appointments']}, {''}
+        )
+        
+        response = self.client.get('/?include_notes=true')
+        self.assertIn(
+            'Prefers short fringe',
+            [appointment['notes'] for appointment in response.json()['appointments']]
+        )
+    
+    def test_update_appointment_writes_touched_fields(self):
+        """Test that a partial update only writes the fields it changed."""
+        appointment = self.appointments[0]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/{appointment.id}', json={'notes': 'Running late'})
+        
+        self.assertEqual(response.json()['notes'], 'Running late')
+        update_sql = next(
+            query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')
+        )
+        self.assertIn('"notes"', update_sql)
+        self.assertNotIn('"price_cents"', update_sql)
+    
+    def test_update_appointment_price_stored_in_cents(self):
+        """Test that prices are stored as whole cents and returned in currency units."""
+        appointment = self.appointments[0]
+        
+        response = self.client.put(f'/{appointment.id}', json={'price': '45.50'})
+        
+        self.assertEqual(response.json()['price'], '45.50')
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.price_cents, 4550)
+        self.assertEqual(appointment.price, Decimal('45.50'))
+    
+    def test_duration_minutes_stored_on_save(self):
+        """Test that the scheduled duration is stored with the appointment."""
+        self.assertEqual(
+            set(Appointment.objects.values_list('duration_minutes', flat=True)), {40}
+        )
+    
+    def test_save_reads_stored_status_once(self):
+        """Test that save() validates the transition from the status it already read."""
+        appointment = Appointment.objects.get(id=self.appointments[0].id)
+        appointment.status = Appointment.AppointmentStatus.COMPLETED
+        
+        with self.assertNumQueries(2):  # stored status + service for the duration check
+            with self.assertRaises(ValidationError):
+                appointment.save()
+    
+    def test_update_appointment_rejects_invalid_transition(self):
+        """Test that validated API updates still refuse invalid status transitions."""
+        appointment = self.appointments[0]
+        
+        with self.assertRaises(ValidationError):
+            self.client.put(f'/{appointment.id}', json={'status': 'completed'})
+        
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.status, Appointment.AppointmentStatus.PENDING)
+    
+    def test_status_change_defers_notification_to_commit(self):
+        """Test that saving a status change sends its notification only after commit."""
+        appointment = Appointment.objects.get(id=self.appointments[0].id)
+        appointment.status = Appointment.AppointmentStatus.CONFIRMED
+        
+        with patch('apps.notifications.services.NotificationService.send_appointment_confirmation') as mock_send:
+            with self.captureOnCommitCallbacks() as callbacks:
+                appointment.save()
+            mock_send.assert_not_called()
+            
+            for callback in callbacks:
+                callback()
+            mock_send.assert_called_once()
+    
+    def test_available_time_slots_skip_overlapping_bookings(self):
+        """Test that only slots overlapping a booking (even by a partial minute) are dropped."""
+        booking = self.appointments[0]
+        booking_start = timezone.localtime(booking.scheduled_start_time)
+        working_start = booking_start.replace(second=0, microsecond=0) - timedelta(hours=2)
+        working_end = working_start + timedelta(hours=5)
+        
+        slots = AppointmentService.get_available_time_slots(
+            self.staff_member, booking_start, 40, working_start, working_end
+        )
+        
+        expected = []
+        slot_start = working_start
+        while slot_start + timedelta(minutes=40) <= working_end:
+            slot_end = slot_start + timedelta(minutes=40)
+            if not (slot_start < booking.scheduled_end_time and slot_end > booking.scheduled_start_time):
+                expected.append((slot_start, slot_end))
+            slot_start += timedelta(minutes=30)
+        self.assertEqual(slots, expected)
+        self.assertLess(len(slots), 9)  # 9 slots fit the 5-hour window
+    
+    def test_check_availability_single_query(self):
+        """Test that staff and client conflicts are resolved with one query."""
+        booking = self.appointments[0]
+        other_client = Client.objects.create(
+            first_name="Ann", last_name="Lee", email="ann.lee@example.com", phone="+1234567891"
+        )
+        
+        with self.assertNumQueries(1):
+            staff_ok, client_ok = AppointmentService.check_availability(
+                self.staff_member, other_client,
+                booking.scheduled_start_time, booking.scheduled_end_time
             )
+        self.assertEqual((staff_ok, client_ok), (False, True))
+        
+        is_valid, error_message = AppointmentService.validate_appointment_time(
+            self.staff_member, booking.scheduled_start_time, booking.scheduled_end_time,
+            booking.id, client=self.client_obj
+        )
+        self.assertTrue(is_valid, error_message)
+    
+    def test_check_staff_availability_bulk_matches_single_checks(self):
+        """Test that bulk candidate checks agree with per-slot checks using one query."""
+        booking = self.appointments[1]
+        candidates = [
+            (booking.scheduled_start_time + timedelta(minutes=offset),
+             booking.scheduled_start_time + timedelta(minutes=offset + 40))
+            for offset in range(-90, 91, 15)
+        ]
         
-        # Call the task directly (without saving the appointment again)
-        send_appointment_cancellation(test_appointment.id)
+        with self.assertNumQueries(1):
+            available = AppointmentService.check_staff_availability_bulk(self.staff_member, candidates)
         
-        # Verify that the cancellation notification was sent
-        mock_send_cancellation.assert_called_once()
\ No newline at end of file
+        self.assertEqual(available, [
+            AppointmentService.check_staff_availability(self.staff_member, start, end)
+            for start, end in candidates
+        ])
+        self.assertIn(True, available)
+        self.assertIn(False, available)
+    
+    def test_local_day_range_spans_dst_change(self):
+        """Test that day ranges run between local midnights, including DST days."""
+        day_start, day_end = AppointmentService.local_day_range(datetime(2026, 3, 29).date())
+        
+        self.assertEqual(timezone.localtime(day_start).hour, 0)
+        self.assertEqual(timezone.localtime(day_end).date(), datetime(2026, 3, 30).date())
+        elapsed = day_end.timestamp() - day_start.timestamp()
+        self.assertEqual(elapsed, 23 * 3600)  # Europe/Warsaw springs forward
+    
+    def _bulk_rows(self, *day_offsets):
+        """Build bulk_schedule payloads for the setUp client, service and staff member."""
+        rows = []
+        for day in day_offsets:
+            start_time = timezone.now() + timedelta(days=day)
+            rows.append({
+                'client_id': self.client_obj.id,
+                'service_id': self.service.id,
+                'staff_member_id': self.staff_member.id,
+                'scheduled_start_time': start_time,
+                'scheduled_end_time': start_time + timedelta(minutes=40),
+                'price': '30.00',
+            })
+        return rows
+    
+    @patch('apps.notifications.services.NotificationService.send_appointment_confirmation')
+    def test_bulk_schedule_creates_appointments(self, mock_send_confirmation):
+        """Test that bulk scheduling inserts rows and confirms them after commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            created = AppointmentService.bulk_schedule(self._bulk_rows(10, 11, 12))
+        
+        self.assertEqual(len(created), 3)
+        self.assertEqual(
+            set(Appointment.objects.filter(id__in=[a.pk for a in created])
+                .values_list('duration_minutes', flat=True)),
+            {40}
+        )
+        self.assertEqual(mock_send_confirmation.call_count, 3)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_bulk_schedule_drops_cached_list_totals(self):
+        """Test that bulk scheduling refreshes the cached appointment list total."""
+        cache.clear()
+        total = self.client.get('/').json()['total']
+        
+        with patch('apps.notifications.services.NotificationService'):
+            with self.captureOnCommitCallbacks(execute=True):
+                AppointmentService.bulk_schedule(self._bulk_rows(10, 11))
+        
+        self.assertEqual(self.client.get('/').json()['total'], total + 2)
+    
+    def test_bulk_schedule_validates_rows_against_one_clock_read(self):
+        """Test that bulk validation shares one "now" instead of reading the clock per field."""
+        rows = self._bulk_rows(10, 11, 12)
+        
+        with patch('apps.appointments.schemas.timezone') as mock_timezone:
+            with patch('apps.notifications.services.NotificationService'):
+                AppointmentService.bulk_schedule(rows)
+        mock_timezone.now.assert_not_called()
+    
+    def test_bulk_schedule_rejects_conflicts(self):
+        """Test that bulk scheduling refuses rows overlapping existing or batch bookings."""
+        rows = self._bulk_rows(10, 10)
+        rows[1]['scheduled_start_time'] += timedelta(minutes=10)
+        rows[1]['scheduled_end_time'] += timedelta(minutes=10)
+        
+        with self.assertRaises(ValidationError):
+            AppointmentService.bulk_schedule(rows)
+        self.assertEqual(Appointment.objects.count(), 3)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-14 07:00
+
+from django.db import migrations, models
+
+
+def split_specialties(apps, schema_editor):
+    """Convert comma-separated specialties into lists."""
+    SalonUser = apps.get_model('authentication', 'SalonUser')
+    users = list(SalonUser.objects.exclude(specialties='').only('id', 'specialties'))
+    for user in users:
+        user.specialty_list = [specialty.strip() for specialty in user.specialties.split(',')]
+    SalonUser.objects.bulk_update(users, ['specialty_list'])
+
+
+def join_specialties(apps, schema_editor):
+    """Restore comma-separated specialties from lists."""
+    SalonUser = apps.get_model('authentication', 'SalonUser')
+    users = list(SalonUser.objects.exclude(specialty_list=[]).only('id', 'specialty_list'))
+    for user in users:
+        user.specialties = ', '.join(user.specialty_list)
+    SalonUser.objects.bulk_update(users, ['specialties'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salonuser',
+            name='specialty_list',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(split_specialties, join_specialties),
+        migrations.RemoveField(
+            model_name='salonuser',
+            name='specialties',
+        ),
+        migrations.RenameField(
+            model_name='salonuser',
+            old_name='specialty_list',
+            new_name='specialties',
+        ),
+        migrations.AlterField(
+            model_name='salonuser',
+            name='specialties',
+            field=models.JSONField(blank=True, default=list, help_text='List of specialties (e.g., ["manicure", "pedicure", "facial"])'),
+        ),
+    ]
@@ -10,6 +10,16 @@ from django.utils.translation import gettext_lazy as _
 from apps.core.models import BaseModel
 
 
+# Roles allowed each salon capability (raw UserRole values)
+_ROLE_PERMISSIONS = {
+    'manage_salon': frozenset({'owner', 'manager'}),
+    'manage_staff': frozenset({'owner'}),
+    'view_reports': frozenset({'owner', 'manager'}),
+    'manage_inventory': frozenset({'owner', 'manager'}),
+    'process_payments': frozenset({'owner', 'manager', 'receptionist'}),
+}
+
+
 class SalonUser(AbstractUser, BaseModel):
     """
     Custom user model for salon staff and administrators.
@@ -65,9 +75,10 @@ class SalonUser(AbstractUser, BaseModel):
         help_text="Commission percentage for services (e.g., 40.00 for 40%)"
     )
     
-    specialties = models.TextField(
+    specialties = models.JSONField(
+        default=list,
         blank=True,
-        help_text="Comma-separated list of specialties (e.g., manicure, pedicure, facial)"
+        help_text="List of specialties (e.g., [\"manicure\", \"pedicure\", \"facial\"])"
     )
     
     bio = models.TextField(
@@ -125,39 +136,37 @@ class SalonUser(AbstractUser, BaseModel):
     @property
     def can_manage_salon(self):
         """Check if user can manage salon operations."""
-        return self.role in [self.UserRole.OWNER, self.UserRole.MANAGER]
+        return self.has_capability('manage_salon')
 
     @property
     def can_manage_staff(self):
         """Check if user can manage staff."""
-        return self.role == self.UserRole.OWNER
+        return self.has_capability('manage_staff')
 
     @property
     def can_view_reports(self):
         """Check if user can view business reports."""
-        return self.role in [self.UserRole.OWNER, self.UserRole.MANAGER]
+        return self.has_capability('view_reports')
 
     @property
     def can_manage_inventory(self):
         """Check if user can manage inventory."""
-        return self.role in [self.UserRole.OWNER, self.UserRole.MANAGER]
+        return self.has_capability('manage_inventory')
 
     @property
     def can_process_payments(self):
         """Check if user can process payments."""
-        return self.role in [
-            self.UserRole.OWNER, 
-            self.UserRole.MANAGER, 
-            self.UserRole.RECEPTIONIST
-        ]
+        return self.has_capability('process_payments')
+
+    def has_capability(self, capability):
+        """Check if the user's role grants a salon capability (e.g. 'manage_salon')."""
+        return self.role in _ROLE_PERMISSIONS[capability]
 
     def get_specialties_list(self):
         """
         Return specialties as a list.
         """
-        if not self.specialties:
-            return []
-        return [specialty.strip() for specialty in str(self.specialties).split(',')]
+        return list(self.specialties or [])
 
     def add_specialty(self, specialty):
         """
@@ -166,8 +175,8 @@ class SalonUser(AbstractUser, BaseModel):
         specialties = self.get_specialties_list()
         if specialty not in specialties:
             specialties.append(specialty)
-            self.specialties = ', '.join(specialties)
-            self.save()
+            self.specialties = specialties
+            self.save(update_fields=['specialties'])
 
     def remove_specialty(self, specialty):
         """
@@ -176,8 +185,8 @@ class SalonUser(AbstractUser, BaseModel):
         specialties = self.get_specialties_list()
         if specialty in specialties:
             specialties.remove(specialty)
-            self.specialties = ', '.join(specialties)
-            self.save()
+            self.specialties = specialties
+            self.save(update_fields=['specialties'])
 
 
 class UserProfile(BaseModel):
@@ -1,9 +1,13 @@
 from ninja import Router
 from ninja.pagination import paginate, PageNumberPagination
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.utils import timezone
+from django.db.models import CharField, Count, Value, Window
+from django.db.models.functions import Concat
 from django.core.exceptions import ValidationError
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import math
 
 from .models import Client
@@ -14,10 +18,67 @@ from .schemas import (
     ClientListResponseSchema,
     ClientSearchSchema
 )
+from apps.core.responses import orjson_response
 
 router = Router()
 
 
+# Columns client responses read; rows are fetched as dicts, not model instances
+_CLIENT_LIST_FIELDS = (
+    'id',
+    'first_name',
+    'last_name',
+    'email',
+    'phone',
+    'allergies',
+    'notes',
+    'full_name',
+    'created_at',
+    'updated_at',
+)
+
+# Text the name/email search matches against; on PostgreSQL the
+# clients_search_trgm index (clients migration 0002) covers this expression
+_CLIENT_SEARCH_TEXT = Concat(
+    'first_name', Value(' '), 'last_name', Value(' '), 'email',
+    output_field=CharField()
+)
+
+
+def _client_page(queryset, page: int, page_size: int) -> Tuple[List[dict], int]:
+    """
+    Fetch one page of clients together with the total number of matches.
+    
+    The total comes from a COUNT(*) OVER () column on the page query itself,
+    so no separate COUNT query is needed unless the page is past the end.
+    """
+    offset = (page - 1) * page_size
+    rows = list(
+        queryset.values(*_CLIENT_LIST_FIELDS)
+        .annotate(total_count=Window(Count('id')))
+        .order_by('last_name', 'first_name')[offset:offset + page_size]
+    )
+    if rows:
+        total = rows[0]['total_count']
+    else:
+        # An empty page carries no window total; only count when it can be non-zero
+        total = queryset.count() if offset else 0
+    for row in rows:
+        del row['total_count']
+    return rows, total
+
+
+def _client_list_response(rows: List[dict], total: int, page: int, page_size: int):
+    """Serialize a page of client rows straight to JSON, shaped like ClientListResponseSchema."""
+    return orjson_response({
+        'clients': rows,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': math.ceil(total / page_size),
+    })
+
+
 @router.post("/", response=ClientResponseSchema, tags=["Clients"])
 def create_client(request, data: ClientCreateSchema):
     """
@@ -81,31 +142,34 @@ def update_client(request, client_id: int, data: ClientUpdateSchema):
     Updates client information with provided data.
     Only provided fields will be updated (partial update).
     """
-    client = get_object_or_404(Client, id=client_id)
-    
     try:
-        # Update only provided fields
+        # The schema has already validated the provided fields
         update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(client, field, value)
         
-        client.full_clean()  # Validate model
-        client.save()
+        # Write only the provided columns; email uniqueness is enforced by the database
+        try:
+            with transaction.atomic():
+                updated = Client.objects.filter(id=client_id).update(
+                    **update_data, updated_at=timezone.now()
+                )
+        except IntegrityError:
+            # Only report the email when another row (soft deleted included) holds it
+            if 'email' in update_data and Client.objects_with_deleted.filter(
+                email=update_data['email']
+            ).exclude(id=client_id).exists():
+                raise ValidationError({'email': ['Client with this Email Address already exists.']})
+            raise
+        if not updated:
+            raise Http404("No Client matches the given query.")
         
-        return ClientResponseSchema(
-            id=client.id,
-            first_name=client.first_name,
-            last_name=client.last_name,
-            email=client.email,
-            phone=client.phone,
-            allergies=client.allergies,
-            notes=client.notes,
-            full_name=client.full_name,
-            created_at=client.created_at,
-            updated_at=client.updated_at
+        # Read back the row, including the full_name the database recomputed
+        return ClientResponseSchema.model_construct(
+            **Client.objects.values(*_CLIENT_LIST_FIELDS).get(id=client_id)
         )
     except ValidationError as e:
         raise ValidationError(f"Client update failed: {e}")
+    except Http404:
+        raise
     except Exception as e:
         raise Exception(f"Unexpected error updating client: {e}")
 
@@ -142,40 +206,10 @@ def list_clients(request, page: int = 1, page_size: int = 20):
     if page_size < 1 or page_size > 100:
         page_size = 20
     
-    # Get total count
-    total = Client.objects.count()  # type: ignore
-    total_pages = math.ceil(total / page_size)
-    
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
-    # Get clients for current page
-    clients = Client.objects.all().order_by('last_name', 'first_name')[offset:offset + page_size]  # type: ignore
+    # Get clients for current page and the total count in one query
+    rows, total = _client_page(Client.objects.all(), page, page_size)  # type: ignore
     
-    # Convert to response schemas
-    client_list = [
-        ClientResponseSchema(
-            id=client.id,
-            first_name=client.first_name,
-            last_name=client.last_name,
-            email=client.email,
-            phone=client.phone,
-            allergies=client.allergies,
-            notes=client.notes,
-            full_name=client.full_name,
-            created_at=client.created_at,
-            updated_at=client.updated_at
-        )
-        for client in clients
-    ]
-    
-    return ClientListResponseSchema(
-        clients=client_list,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return _client_list_response(rows, total, page, page_size)
 
 
 @router.get("/search/", response=ClientListResponseSchema, tags=["Clients"])
@@ -195,11 +229,9 @@ def search_clients(request, query: Optional[str] = None, email: Optional[str] =
     queryset = Client.objects.all()  # type: ignore
     
     if query:
-        # Search in first_name, last_name, or email
-        queryset = queryset.filter(
-            Q(first_name__icontains=query) |  # type: ignore
-            Q(last_name__icontains=query) |  # type: ignore
-            Q(email__icontains=query)  # type: ignore
+        # Search in first_name, last_name, or email with one trigram-indexed predicate
+        queryset = queryset.annotate(search_text=_CLIENT_SEARCH_TEXT).filter(
+            search_text__icontains=query
         )
     
     if email:
@@ -208,38 +240,10 @@ def search_clients(request, query: Optional[str] = None, email: Optional[str] =
     if phone:
         queryset = queryset.filter(phone__icontains=phone)
     
-    # Get total count for filtered results
-    total = queryset.count()
-    total_pages = math.ceil(total / page_size)
+    # Get results and the total count for filtered results in one query
+    rows, total = _client_page(queryset, page, page_size)
     
-    # Calculate offset and get results
-    offset = (page - 1) * page_size
-    clients = queryset.order_by('last_name', 'first_name')[offset:offset + page_size]
-    
-    # Convert to response schemas
-    client_list = [
-        ClientResponseSchema(
-            id=client.id,
-            first_name=client.first_name,
-            last_name=client.last_name,
-            email=client.email,
-            phone=client.phone,
-            allergies=client.allergies,
-            notes=client.notes,
-            full_name=client.full_name,
-            created_at=client.created_at,
-            updated_at=client.updated_at
-        )
-        for client in clients
-    ]
-    
-    return ClientListResponseSchema(
-        clients=client_list,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return _client_list_response(rows, total, page, page_size)
 
 
 # Health check endpoint
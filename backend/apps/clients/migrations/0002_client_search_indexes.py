@@ -0,0 +1,55 @@
+"""
+Index client name/email search and case-insensitive email lookups.
+
+The trigram index is PostgreSQL only: it needs pg_trgm and GIN, so other
+backends (the SQLite development database) skip it and scan the table.
+pg_trgm is created if missing but left installed on rollback, since other
+objects may depend on it.
+Its expression mirrors _CLIENT_SEARCH_TEXT in clients.api, uppercased the
+way icontains compares on PostgreSQL.
+"""
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Concat, Upper
+
+
+def _search_index():
+    return GinIndex(
+        OpClass(
+            Upper(Concat(
+                'first_name', models.Value(' '), 'last_name', models.Value(' '), 'email',
+                output_field=models.CharField()
+            )),
+            name='gin_trgm_ops'
+        ),
+        name='clients_search_trgm',
+        condition=models.Q(is_deleted=False)
+    )
+
+
+def add_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.add_index(apps.get_model('clients', 'Client'), _search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('clients', 'Client'), _search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_mvp_client_model'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Upper('email'), condition=models.Q(('is_deleted', False)), name='clients_email_upper_idx'),
+        ),
+        migrations.RunPython(add_search_index, drop_search_index),
+    ]
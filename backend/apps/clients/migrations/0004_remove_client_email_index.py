@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-14 06:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_client_full_name'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='clients_email_4c8bec_idx',
+        ),
+    ]
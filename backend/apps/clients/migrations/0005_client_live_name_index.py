@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-14 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_remove_client_email_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='clients_last_na_7dc725_idx',
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['last_name', 'first_name'], name='clients_live_name_idx'),
+        ),
+    ]
@@ -4,6 +4,8 @@ Provides basic client management for appointment booking.
 """
 
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat, Upper
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
@@ -47,6 +49,14 @@ class Client(BaseModel):
         help_text=_('Client phone number for SMS notifications')
     )
     
+    # Computed by the database so list queries return it with the row
+    full_name = models.GeneratedField(
+        expression=Concat('first_name', Value(' '), 'last_name'),
+        output_field=models.CharField(max_length=101),
+        db_persist=True,
+        verbose_name=_('Full Name')
+    )
+    
     # Basic Preferences
     allergies = models.TextField(
         blank=True,
@@ -66,18 +76,23 @@ class Client(BaseModel):
         verbose_name_plural = _('Clients')
         ordering = ['last_name', 'first_name']
         indexes = [
-            models.Index(fields=['last_name', 'first_name']),
-            models.Index(fields=['email']),
+            # Serves list and search ordering over live (not soft-deleted) clients
+            models.Index(
+                fields=['last_name', 'first_name'],
+                name='clients_live_name_idx',
+                condition=models.Q(is_deleted=False)
+            ),
+            # Serves case-insensitive email lookups (email__iexact)
+            models.Index(
+                Upper('email'),
+                name='clients_email_upper_idx',
+                condition=models.Q(is_deleted=False)
+            ),
         ]
     
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
     
-    @property
-    def full_name(self):
-        """Return full name of the client."""
-        return f'{self.first_name} {self.last_name}'
-    
     def clean(self):
         """Validate client data."""
         super().clean()
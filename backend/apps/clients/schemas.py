@@ -5,10 +5,15 @@ Provides request/response validation and serialization for the Client management
 
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ConfigDict
 import re
 
 
+# Phone format shared with Client.phone's RegexValidator, compiled once
+_PHONE_SEPARATORS_RE = re.compile(r'[\s\-\(\)]')
+_PHONE_RE = re.compile(r'\+?1?\d{9,15}')
+
+
 class ClientCreateSchema(BaseModel):
     """
     Schema for creating a new client.
@@ -52,9 +57,9 @@ class ClientCreateSchema(BaseModel):
         """Validate phone number format."""
         if v is not None and v.strip():
             # Remove spaces and common separators
-            phone_cleaned = re.sub(r'[\s\-\(\)]', '', v)
+            phone_cleaned = _PHONE_SEPARATORS_RE.sub('', v)
             # Check format: optional + followed by 9-15 digits
-            if not re.match(r'^\+?1?\d{9,15}$', phone_cleaned):
+            if not _PHONE_RE.fullmatch(phone_cleaned):
                 raise ValueError(
                     'Phone number must be in format: "+999999999". Up to 15 digits allowed.'
                 )
@@ -130,9 +135,9 @@ class ClientUpdateSchema(BaseModel):
         """Validate phone number format."""
         if v is not None and v.strip():
             # Remove spaces and common separators
-            phone_cleaned = re.sub(r'[\s\-\(\)]', '', v)
+            phone_cleaned = _PHONE_SEPARATORS_RE.sub('', v)
             # Check format: optional + followed by 9-15 digits
-            if not re.match(r'^\+?1?\d{9,15}$', phone_cleaned):
+            if not _PHONE_RE.fullmatch(phone_cleaned):
                 raise ValueError(
                     'Phone number must be in format: "+999999999". Up to 15 digits allowed.'
                 )
@@ -149,6 +154,16 @@ class ClientUpdateSchema(BaseModel):
             return v.strip()
         return v
     
+    @model_validator(mode='after')
+    def validate_no_nulls(self):
+        """Reject explicit nulls, since no client column is nullable."""
+        null_fields = sorted(
+            field for field in self.model_fields_set if getattr(self, field) is None
+        )
+        if null_fields:
+            raise ValueError(f"Fields cannot be null: {', '.join(null_fields)}")
+        return self
+    
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -19,6 +19,8 @@ from apps.clients.schemas import (
     ClientListResponseSchema,
     ClientSearchSchema
 )
+from apps.clients.api import router
+from ninja.testing import TestClient as NinjaTestClient
 
 
 class ClientModelTestCase(TestCase):
@@ -79,7 +81,7 @@ class ClientModelTestCase(TestCase):
             Client.objects.create(**duplicate_data)  # type: ignore
     
     def test_client_full_name_property(self):
-        """Test the full_name computed property."""
+        """Test the database-generated full_name field."""
         client = Client.objects.create(**self.valid_client_data)  # type: ignore
         self.assertEqual(client.full_name, 'Maria Rodriguez')
     
@@ -216,6 +218,12 @@ class ClientSchemaTestCase(TestCase):
         self.assertIsNone(schema.first_name)
         self.assertIsNone(schema.last_name)
     
+    def test_client_update_schema_rejects_explicit_nulls(self):
+        """Test ClientUpdateSchema rejects fields explicitly set to null."""
+        for field in ['email', 'phone', 'notes']:
+            with self.assertRaises(PydanticValidationError):
+                ClientUpdateSchema(**{field: None})
+    
     def test_client_response_schema_serialization(self):
         """Test ClientResponseSchema serialization."""
         from datetime import datetime
@@ -252,6 +260,111 @@ class ClientSchemaTestCase(TestCase):
             ClientSearchSchema(page_size=101)
 
 
+class ClientAPITestCase(TestCase):
+    """Test the client API endpoints."""
+    
+    def setUp(self):
+        self.api = NinjaTestClient(router)
+        Client.objects.create(
+            first_name='Maria',
+            last_name='Rodriguez',
+            email='maria.rodriguez@email.com',
+            phone='+1234567890',
+            allergies='Shellfish allergy'
+        )
+        Client.objects.create(
+            first_name='Anna',
+            last_name='Kowalska',
+            email='anna.kowalska@email.com'
+        )
+    
+    def test_list_clients_returns_ordered_rows(self):
+        """Test that listing clients returns every field, ordered by name."""
+        with self.assertNumQueries(1):
+            response = self.api.get('/')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual([c['last_name'] for c in data['clients']], ['Kowalska', 'Rodriguez'])
+        maria = data['clients'][1]
+        self.assertEqual(maria['full_name'], 'Maria Rodriguez')
+        self.assertEqual(maria['phone'], '+1234567890')
+        self.assertEqual(maria['allergies'], 'Shellfish allergy')
+        self.assertIn('created_at', maria)
+    
+    def test_list_and_search_query_count_independent_of_page_size(self):
+        """Test that a full page of clients is listed and searched in one query."""
+        Client.objects.bulk_create([
+            Client(first_name=f'Guest{i}', last_name='Visitor', email=f'guest{i}@email.com')
+            for i in range(50)
+        ])
+        
+        with self.assertNumQueries(1):
+            response = self.api.get('/?page_size=50')
+        self.assertEqual(len(response.json()['clients']), 50)
+        
+        with self.assertNumQueries(1):
+            response = self.api.get('/search/?query=visitor&page_size=50')
+        self.assertEqual(len(response.json()['clients']), 50)
+    
+    def test_list_clients_page_past_end_keeps_total(self):
+        """Test that an empty page past the end still reports the total."""
+        response = self.api.get('/?page=3&page_size=1')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['clients'], [])
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['total_pages'], 2)
+    
+    def test_update_client_returns_recomputed_full_name(self):
+        """Test that renaming a client returns the full name the database recomputed."""
+        client = Client.objects.get(email='anna.kowalska@email.com')
+        
+        with self.assertNumQueries(4):  # UPDATE in a savepoint + reading back the row
+            response = self.api.put(f'/{client.id}', json={'last_name': 'Nowak'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['full_name'], 'Anna Nowak')
+        self.assertEqual(Client.objects.get(id=client.id).full_name, 'Anna Nowak')
+    
+    def test_update_client_rejects_invalid_changes(self):
+        """Test that updates to a taken email or a missing client are rejected."""
+        client = Client.objects.get(email='anna.kowalska@email.com')
+        
+        with self.assertRaises(ValidationError):
+            self.api.put(f'/{client.id}', json={'email': 'maria.rodriguez@email.com'})
+        self.assertEqual(Client.objects.get(id=client.id).email, 'anna.kowalska@email.com')
+        
+        response = self.api.put('/999999', json={'notes': 'Missing'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_update_client_reports_other_integrity_errors(self):
+        """Test that constraint failures unrelated to the email are not reported as duplicates."""
+        client = Client.objects.get(email='anna.kowalska@email.com')
+        
+        with patch('django.db.models.query.QuerySet.update', side_effect=IntegrityError('CHECK constraint failed')):
+            with self.assertRaises(Exception) as raised:
+                self.api.put(f'/{client.id}', json={'email': 'anna.new@email.com'})
+        self.assertNotIsInstance(raised.exception, ValidationError)
+        self.assertIn('CHECK constraint failed', str(raised.exception))
+    
+    def test_search_clients_filters_rows(self):
+        """Test that searching clients returns only the matching rows."""
+        response = self.api.get('/search/?query=anna')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['clients'][0]['full_name'], 'Anna Kowalska')
+        self.assertEqual(data['clients'][0]['email'], 'anna.kowalska@email.com')
+        
+        # Last names and emails match too, case-insensitively
+        response = self.api.get('/search/?query=RODRIGUEZ@')
+        self.assertEqual([c['full_name'] for c in response.json()['clients']], ['Maria Rodriguez'])
+
+
 class ClientHealthTestCase(TestCase):
     """Test health check endpoint."""
     
@@ -0,0 +1,36 @@
+"""
+Response helpers for Mario Beauty Salon Management System.
+Provides pre-serialized JSON responses for response-heavy API endpoints.
+"""
+
+from typing import Any
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+
+# Ninja renders responses with DjangoJSONEncoder, which writes UTC datetimes
+# with a "Z" suffix and millisecond precision, and Decimals as strings.
+# Datetimes are passed through to it so the wire format stays the same.
+_DJANGO_ENCODER = DjangoJSONEncoder()
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode values orjson does not handle natively the way Ninja's encoder does."""
+    return _DJANGO_ENCODER.default(obj)
+
+
+def orjson_response(data: Any, status: int = 200) -> HttpResponse:
+    """
+    Return data encoded with orjson as an HttpResponse.
+    Django Ninja passes HttpResponse objects through untouched, so endpoints
+    keep their response schema for documentation while skipping the
+    validate/dump/json.dumps round trip at runtime.
+    """
+    return HttpResponse(
+        orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS),
+        status=status,
+        content_type='application/json'
+    )
@@ -4,6 +4,7 @@ Provides notification tracking with delivery status and templates.
 """
 
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
@@ -145,7 +146,6 @@ class Notification(BaseModel):
     
     def mark_as_sent(self):
         """Mark notification as sent."""
-        from django.utils import timezone
         if self.delivery_status == self.DeliveryStatus.PENDING:
             self.delivery_status = self.DeliveryStatus.SENT
             self.sent_at = timezone.now()
@@ -153,7 +153,6 @@ class Notification(BaseModel):
     
     def mark_as_delivered(self):
         """Mark notification as delivered."""
-        from django.utils import timezone
         if self.delivery_status in [self.DeliveryStatus.PENDING, self.DeliveryStatus.SENT]:
             self.delivery_status = self.DeliveryStatus.DELIVERED
             self.delivered_at = timezone.now()
@@ -161,7 +160,6 @@ class Notification(BaseModel):
     
     def mark_as_read(self):
         """Mark notification as read."""
-        from django.utils import timezone
         if self.delivery_status in [self.DeliveryStatus.DELIVERED, self.DeliveryStatus.SENT]:
             self.delivery_status = self.DeliveryStatus.READ
             self.read_at = timezone.now()
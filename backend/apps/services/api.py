@@ -132,7 +132,7 @@ def list_categories(request, page: int = 1, page_size: int = 20):
     total_pages = math.ceil(total / page_size)
     offset = (page - 1) * page_size
     
-    categories = ServiceCategory.objects.all().order_by('display_order', 'name')[offset:offset + page_size]  # type: ignore
+    categories = ServiceCategory.objects.for_list().order_by('display_order', 'name')[offset:offset + page_size]  # type: ignore
     
     category_list = [
         CategoryResponseSchema(
@@ -8,7 +8,26 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
-from apps.core.models import BaseModel
+from apps.core.models import BaseModel, SalonManager
+
+
+class ServiceCategoryManager(SalonManager):
+    """
+    Service category manager excluding soft deleted records.
+    Adds for_list() for the paginated category listing.
+    """
+    
+    # Columns the category responses read, plus the two ancestors that
+    # full_name and level walk (hierarchy depth is capped at 3 levels)
+    LIST_FIELDS = (
+        'id', 'name', 'description', 'parent', 'is_active', 'display_order',
+        'created_at', 'updated_at',
+        'parent__name', 'parent__parent', 'parent__parent__parent',
+    )
+    
+    def for_list(self):
+        """Return categories joined with their ancestors, loading only listed columns."""
+        return self.get_queryset().select_related('parent__parent').only(*self.LIST_FIELDS)
 
 
 class ServiceCategory(BaseModel):
@@ -62,6 +81,8 @@ class ServiceCategory(BaseModel):
         help_text="Order for displaying categories"
     )
     
+    objects = ServiceCategoryManager()
+    
     def __str__(self) -> str:  # type: ignore
         """String representation of the category."""
         if self.parent:
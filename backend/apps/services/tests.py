@@ -79,6 +79,18 @@ class ServiceCategoryModelTests(TestCase):
         )
         self.assertEqual(grandchild_category.level, 2)
         
+    def test_category_level_follows_reparenting(self):
+        """Test level reflects a parent reassigned on the same instance."""
+        child = ServiceCategory.objects.create(  # type: ignore
+            name='Manicure',
+            parent=self.root_category
+        )
+        other = ServiceCategory.objects.create(name='Other Category')  # type: ignore
+        self.assertEqual(other.level, 0)
+        
+        other.parent = child
+        self.assertEqual(other.level, 2)
+        
     def test_category_hierarchy_methods(self):
         """Test hierarchy navigation methods."""
         child1 = ServiceCategory.objects.create(  # type: ignore
@@ -404,6 +416,27 @@ class ServiceCategoryAPITests(TestCase):
         self.assertEqual(len(response_data['categories']), 3)
         self.assertEqual(response_data['total'], 5)
         self.assertEqual(response_data['total_pages'], 2)
+        
+    def test_list_categories_hierarchy_query_count(self):
+        """Test nested categories are listed without per-row parent lookups."""
+        root = ServiceCategory.objects.create(name='Nail Care')  # type: ignore
+        child = ServiceCategory.objects.create(  # type: ignore
+            name='Manicure',
+            parent=root
+        )
+        ServiceCategory.objects.create(  # type: ignore
+            name='Gel Manicure',
+            parent=child
+        )
+        
+        # One count query plus one page query
+        with self.assertNumQueries(2):
+            response = self.client.get('/categories/')
+        
+        self.assertEqual(response.status_code, 200)
+        levels = {c['name']: (c['full_name'], c['level']) for c in response.json()['categories']}
+        self.assertEqual(levels['Gel Manicure'], ('Manicure > Gel Manicure', 2))
+        self.assertEqual(levels['Manicure'], ('Nail Care > Manicure', 1))
 
 
 class ServiceAPITests(TestCase):
@@ -81,12 +81,14 @@ def create_staff(request, payload: StaffCreateSchema):
     return {"success": True, "staff_id": staff_profile.id}  # type: ignore
 
 
+# Columns get_full_name() reads; the list and detail responses need nothing else
+_STAFF_NAME_FIELDS = ('id', 'user__id', 'user__first_name', 'user__last_name', 'user__username')
+
+
 @router.get("/")
 def list_staff(request):
     """List all staff members."""
-    staff_profiles = StaffProfile.objects.select_related('user').prefetch_related(  # type: ignore
-        'specializations', 'working_hours'
-    ).all()
+    staff_profiles = StaffProfile.objects.select_related('user').only(*_STAFF_NAME_FIELDS)  # type: ignore
     return [{"id": s.id, "name": s.user.get_full_name()} for s in staff_profiles]  # type: ignore
 
 
@@ -94,9 +96,7 @@ def list_staff(request):
 def get_staff(request, staff_id: int):
     """Get a specific staff member."""
     staff_profile = get_object_or_404(
-        StaffProfile.objects.select_related('user').prefetch_related(  # type: ignore
-            'specializations', 'working_hours'
-        ), 
+        StaffProfile.objects.select_related('user').only(*_STAFF_NAME_FIELDS),  # type: ignore
         id=staff_id
     )  # type: ignore
     return {"id": staff_profile.id, "name": staff_profile.user.get_full_name()}  # type: ignore
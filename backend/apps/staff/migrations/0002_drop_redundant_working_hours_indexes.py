@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-14 07:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='workinghours',
+            name='staff_worki_staff_p_a69156_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='workinghours',
+            name='staff_worki_day_of__08b54e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='workinghours',
+            name='staff_worki_is_avai_01f519_idx',
+        ),
+    ]
@@ -4,6 +4,7 @@ Provides staff profile management and specialization tracking.
 """
 
 from django.db import models
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
@@ -352,11 +353,7 @@ class WorkingHours(BaseModel):
         verbose_name = _('Working Hours')
         verbose_name_plural = _('Working Hours')
         ordering = ['staff_profile', 'day_of_week']
-        indexes = [
-            models.Index(fields=['staff_profile', 'day_of_week']),
-            models.Index(fields=['day_of_week']),
-            models.Index(fields=['is_available']),
-        ]
+        # The unique constraint's index serves every lookup, all scoped to a staff member
         constraints = [
             models.UniqueConstraint(
                 fields=['staff_profile', 'day_of_week'],
@@ -396,6 +393,14 @@ class WorkingHours(BaseModel):
         """Override save to perform additional validation."""
         self.clean()
         super().save(*args, **kwargs)
+        
+        # Drop the cached week schedule (soft deletes also save)
+        cache.delete(self.week_schedule_cache_key(self.staff_profile_id))  # type: ignore
+    
+    @staticmethod
+    def week_schedule_cache_key(staff_profile_id) -> str:
+        """Cache key of a staff member's week schedule."""
+        return f"staff:{staff_profile_id}:week_schedule"
     
     @property
     def duration_minutes(self):
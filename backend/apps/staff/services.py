@@ -6,6 +6,7 @@ Provides advanced availability calculations and working hours management.
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date, time, timedelta
 from django.utils import timezone
+from django.core.cache import cache
 from django.db.models import Q
 from django.core.exceptions import ValidationError
 
@@ -231,6 +232,36 @@ class WorkingHoursService:
         return schedule
 
 
+    # Working hours change rarely; WorkingHours.save() drops the entry
+    WEEK_SCHEDULE_CACHE_TTL = 6 * 60 * 60  # seconds
+    
+    @staticmethod
+    def get_cached_week_schedule(staff_profile_id: int) -> Tuple[Optional[Tuple[time, time]], ...]:
+        """
+        Get a staff member's available hours for each day of the week.
+        
+        Args:
+            staff_profile_id: ID of the staff member
+            
+        Returns:
+            Tuple indexed by isoweekday (index 0 unused) holding
+            (start_time, end_time), or None when the staff member is not available
+        """
+        cache_key = WorkingHours.week_schedule_cache_key(staff_profile_id)
+        schedule = cache.get(cache_key)
+        if schedule is None:
+            days: List[Optional[Tuple[time, time]]] = [None] * 8
+            working_hours = WorkingHours.objects.filter(
+                staff_profile_id=staff_profile_id,
+                is_available=True
+            ).values_list('day_of_week', 'start_time', 'end_time')  # type: ignore
+            for day_of_week, start_time, end_time in working_hours:
+                days[day_of_week] = (start_time, end_time)
+            schedule = tuple(days)
+            cache.set(cache_key, schedule, WorkingHoursService.WEEK_SCHEDULE_CACHE_TTL)
+        return schedule
+
+
 class StaffPerformanceService:
     """Service for tracking staff performance metrics."""
     
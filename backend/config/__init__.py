@@ -1 +1,6 @@
-# Django configuration package
\ No newline at end of file
+# Django configuration package
+
+# Load the Celery app with Django so shared tasks bind to it
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,14 @@
+"""
+Celery application for Mario Beauty Salon Management System.
+Reads CELERY_* settings from Django and discovers tasks.py in installed apps.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
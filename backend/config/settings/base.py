@@ -88,6 +88,7 @@ DATABASES = {
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
         'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,  # Drop dead persistent connections before reuse
         'OPTIONS': {
             'connect_timeout': 10,
         },
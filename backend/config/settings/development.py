@@ -3,6 +3,7 @@ Development settings for Mario Beauty Salon Management System.
 """
 
 from .base import *
+import sys
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -28,9 +29,14 @@ if config('DB_NAME', default=None):
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
             'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+    # Test databases are thrown away, so commits needn't wait for the WAL flush
+    if sys.argv[1:2] == ['test'] or 'pytest' in sys.modules:
+        DATABASES['default']['OPTIONS'] = {'options': '-c synchronous_commit=off'}
+
 # Development-specific apps
 INSTALLED_APPS += [
     'debug_toolbar',